@@ -1,6 +1,7 @@
 # Essentials
 import json
 import os
+import hashlib
 from pathlib import Path
 import re
 
@@ -8,8 +9,7 @@ import re
 import pandas as pd
 from pandas import DataFrame
 from xlrd import open_workbook
-import tempfile
-import csv
+import importlib.util
 pd.options.mode.chained_assignment = None  # default='warn'
 
 # For environment variables
@@ -28,9 +28,165 @@ from selenium import webdriver
 import time
 import selenium.webdriver.common.action_chains as AC
 import sys
+import io
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, Future
+from urllib.parse import urlsplit, urljoin
+from html.parser import HTMLParser
+
+# For codeBeamer's REST API
+import urllib3
 
 DEBUG = True
 SYQT_HOME_DIR = ""
+# Browser options from the environment, see `load_env`
+HEADLESS = False
+CB_PROFILE_DIR = ""
+# Read-only lookups through plain GETs with the browser's session
+HYBRID = True
+# Checks the tickets of the failed test cases through the API before the run
+CHECK_TICKETS = True
+
+# codeBeamer cookies of the last login, reused until the session expires
+CB_SESSION_FILE = ".cb_session.json"
+
+# What the browser downloads, picked with CB_RESOURCE_POLICY. The automation
+# only needs the DOM, scripts, styles and XHR, so "lean" skips the rest.
+RESOURCE_POLICY = "lean"
+RESOURCE_POLICIES = {
+    "full": {
+        "page_load_strategy": "normal",
+        "images": True,
+        "blocked_urls": [],
+    },
+    "lean": {
+        "page_load_strategy": "eager",
+        "images": False,
+        "blocked_urls": [
+            "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.ico", "*.webp",
+            "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+            "*/userPhoto/*", "*/avatar*",
+            "*google-analytics.com*", "*googletagmanager.com*",
+            "*matomo*", "*piwik*",
+        ],
+    },
+}
+
+# CSS selectors of the codeBeamer markup the automation relies on, by the
+# page or popup they are on. `probe_page` checks a whole page in one call
+# before it's used. Project-specific ones are in PROJECT_SELECTORS.
+SELECTORS = {
+    "login": {
+        "user": "#user",
+        "login_error": "div.error, span.error, .invalidfield",
+    },
+    "tree": {
+        "tree_pane": "#treePane",
+        "tree_search": "#searchBox_treePane",
+        "tree_go": "#go_treePane",
+        "filter_label": "span.filterLabel",
+        "search_button": "#actionBarSearchButton",
+    },
+    "filter": {
+        "filter_menu": ".ui-widget-header.ui-corner-all.ui-multiselect-header"\
+                       ".ui-helper-clearfix.ui-multiselect-hasfilter + ul",
+    },
+    "status_filter": {
+        "status_menu": 'div[class="ui-multiselect-menu ui-widget '\
+                       'ui-widget-content ui-corner-all queryConditionSelector '\
+                       'statusSelector"]',
+    },
+    "test_set": {
+        "test_set_count": "#testSetTestCases-tab",
+        "test_set_summary": ".breadcrumbs-summary>a.generated-link",
+        "new_test_run": 'img[title="New Test Run"]',
+    },
+    "test_run": {
+        "tests_finished": 'span[title="Number of Tests finished."]',
+        "run_summary": "#summaryTd a:last-child",
+        "pass_button": "#buttonTable tr > td button:first-of-type",
+        "fail_button": 'button[name="failStep"]',
+        "block_button": 'button[name="blockStep"]',
+    },
+    "run_dialog": {
+        "conclusion": "#conclusionInDialog",
+        "dialog_buttons": "body > div.ui-dialog.ui-corner-all.ui-widget"\
+                          ".ui-widget-content.ui-front.cbModalDialog"\
+                          ".ui-dialog-buttons.ui-resizable > "\
+                          "div.ui-dialog-buttonpane.ui-widget-content"\
+                          ".ui-helper-clearfix > div",
+    },
+}
+PROJECT_SELECTORS = {
+    "mib3oigp": {
+        "location_filter": {
+            "location_menu": 'div[class="ui-multiselect-menu ui-widget '\
+                             'ui-widget-content ui-corner-all '\
+                             'queryConditionSelector '\
+                             '73303386choiceList11Selector"]',
+        },
+    },
+    "nar classic": {
+        "location_filter": {
+            "location_menu": 'div[class="ui-multiselect-menu ui-widget '\
+                             'ui-widget-content ui-corner-all '\
+                             'queryConditionSelector '\
+                             '94014605choiceList11Selector"]',
+        },
+    },
+}
+# The filter list is the nth match of "filter_menu"
+FILTER_MENU_NTH = 3
+# Selectors that must match more than one element
+SELECTOR_MIN_COUNTS = {"filter_menu": FILTER_MENU_NTH + 1}
+
+# How test sets are created, set per project with "transport" in the CONFIG.
+# "ui" drives the browser, "rest" calls codeBeamer's REST API.
+TRANSPORTS = ("ui", "rest")
+# Keys a project may leave out of the CONFIG, with their defaults. They
+# aren't part of `config_template`, so older CONFIG files still load.
+OPTIONAL_PROJECT_KEYS = {"transport": "ui", "test_set_tracker_id": ""}
+CB_API_PATH = "/cb/api/v3"
+# Ids in a single cbQL query of the REST transport
+CB_API_BATCH_SIZE = 500
+# Results of the spreadsheet as the REST API names them. "na" is blocked,
+# as in the test run UI.
+REST_RESULTS = {
+    "pass": "PASSED", "fail": "FAILED", "blocked": "BLOCKED", "na": "BLOCKED"}
+# Results per request, requests in flight and tries per result when the
+# REST transport submits a test run
+RESULT_BATCH_SIZE = 50
+RESULT_WORKERS = 4
+RESULT_TRIES = 3
+TEST_RUN_LINK_PATTERN = re.compile(r"/cb/(?:issue|item)/(\d+)")
+# Ticket ids looked up on codeBeamer before the run, and for how many
+# seconds an existing and a missing ticket are trusted
+TICKET_CACHE_FILE = ".cb_ticket_cache.json"
+TICKET_CACHE_TTL = {True: 24 * 3600, False: 10 * 60}
+TICKET_WORKERS = 4
+# The ticket check is optional, so an unreachable API is given up on quickly
+TICKET_CHECK_TIMEOUT = 5
+# Seconds the bug dialog waits for the results of a search for several bugs
+BUG_SEARCH_TIMEOUT = 3
+# The "Test Cases" table of Test Set items and its test case column
+TEST_SET_CASES_FIELD_ID = 1000000
+TEST_SET_CASE_COLUMN_ID = 1000001
+
+# Maps [project][component] to the location of its SyQT workbook
+SYQT_INDEX_FILE = ".syqt_index.json"
+SYQT_FILE_PATTERN = re.compile(r"^\[(.+?)\]\[(.+?)\] syqt test case full\.xlsx$")
+
+# Cleaned spreadsheets from `setup_df`, keyed by their content and CONFIG.
+# Bump the version whenever `setup_df` changes what it returns.
+DF_CACHE_DIR = ".syqt_cache"
+DF_CACHE_VERSION = 5
+
+# Number of problems printed from the validation report
+VALIDATION_REPORT_MAX_LINES = 20
+
+# Captures the 8-digit codeBeamer ticket id at the end of a link path,
+# e.g. 'http://vwavncb.lge.com:8080/cb/issue/12345678'
+TICKET_LINK_PATTERN = re.compile(r"https?://[^\s]*/(\d{8})")
 
 
 class IncompleteColumnError(Exception):
@@ -56,6 +212,24 @@ class CodeBeamerMaintenance(Exception):
         self.message = message
         super().__init__(self.message)
 
+class SelectorProbeFailed(Exception):
+    """ Exception raised when codeBeamer's markup no longer matches SELECTORS. """
+    def __init__(self, message="codeBeamer's markup seems to have changed."):
+        self.message = message
+        super().__init__(self.message)
+
+class CodeBeamerApiError(Exception):
+    """ Exception raised when codeBeamer's REST API rejects a request. """
+    def __init__(self, message="codeBeamer's REST API rejected the request."):
+        self.message = message
+        super().__init__(self.message)
+
+class ResultsNotSubmitted(Exception):
+    """ Exception raised when some results of a test run couldn't be stored. """
+    def __init__(self, message="Some results of the test run couldn't be submitted."):
+        self.message = message
+        super().__init__(self.message)
+
 class NoEntryFound(Exception):
     """Exception raised when no entry is found using .loc of a dataframe"""
     def __init__(self, message="No specified row is found."):
@@ -63,6 +237,48 @@ class NoEntryFound(Exception):
         super().__init__(self.message)
 
 
+class RunRecord:
+    """ A test case to be run, as recorded on the spreadsheet. """
+    __slots__ = ("id", "name", "result", "comment", "tickets")
+
+    def __init__(
+            self, id: str, name: str, result: str, comment: str,
+            tickets: tuple[str, ...]):
+        self.id = id
+        self.name = name
+        self.result = result
+        self.comment = comment
+        self.tickets = tickets
+
+class RunPlan:
+    """ Compact form of the cleaned dataframe holding only what creating the
+        test set and the test run need. Built with `build_run_plan`.
+    """
+    __slots__ = ("records", "res_col", "by_id")
+
+    def __init__(self, records: list[RunRecord], res_col: str):
+        self.records = records
+        self.res_col = res_col
+        # The first row of an id wins, as duplicates share the same results
+        self.by_id: dict[str, RunRecord] = {}
+        for record in records:
+            self.by_id.setdefault(record.id, record)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def find(self, tc_id: str) -> RunRecord | None:
+        """ Returns the first test case with the codeBeamer id, if any. """
+        return self.by_id.get(tc_id)
+
+    def missing(self, tc_ids) -> list[str]:
+        """ Returns the ids that are not on the spreadsheet, in order. """
+        return [tc_id for tc_id in tc_ids if tc_id not in self.by_id]
+
+
 # Define the template for the configuration
 config_template = {
     "settings": {
@@ -140,6 +356,25 @@ def load_env():
     CB_PASS = os.getenv("CB_PASS")
     if not (SYQT_HOME_DIR and CB_ID and CB_PASS) :
         raise Exception("Ooof, you need to configure your environment variable 😗 Ask Seung for one he hasn't given you one.")
+
+    # Optional
+    global HEADLESS
+    global CB_PROFILE_DIR
+    HEADLESS = os.getenv("CB_HEADLESS", "").strip().lower() in ("1", "true", "yes")
+    CB_PROFILE_DIR = os.getenv("CB_PROFILE_DIR", "")
+
+    global HYBRID
+    HYBRID = os.getenv("CB_HYBRID", "true").strip().lower() in ("1", "true", "yes")
+
+    global CHECK_TICKETS
+    CHECK_TICKETS = os.getenv("CB_CHECK_TICKETS", "true").strip().lower() in ("1", "true", "yes")
+
+    global RESOURCE_POLICY
+    RESOURCE_POLICY = os.getenv("CB_RESOURCE_POLICY", RESOURCE_POLICY).strip().lower()
+    if RESOURCE_POLICY not in RESOURCE_POLICIES:
+        raise Exception(
+            f"Unknown CB_RESOURCE_POLICY '{RESOURCE_POLICY}'. "\
+            f"Use one of: {', '.join(RESOURCE_POLICIES)}")
     
 def get_all_keys(nested_dict):
     keys_list = []
@@ -149,11 +384,16 @@ def get_all_keys(nested_dict):
             keys_list.extend(get_all_keys(value))
     return keys_list
 
+def project_setting(proj_name: str, key: str) -> str:
+    """ Setting of the project, or its default if it's optional and unset. """
+    return CONFIG["settings"][proj_name].get(key, OPTIONAL_PROJECT_KEYS.get(key))
+
 def load_config():
     try:
         with open('test_set.json', 'r') as config_file:
             t = json.load(config_file)
-            if get_all_keys(t) != get_all_keys(config_template):
+            keys = [k for k in get_all_keys(t) if k not in OPTIONAL_PROJECT_KEYS]
+            if keys != get_all_keys(config_template):
                 print(set(get_all_keys(config_template)) - set(get_all_keys(t)))
                 raise json.JSONDecodeError("Invalid CONFIG file.", "", 0 )
             return t
@@ -257,139 +497,544 @@ def get_user_selection(CONFIG) -> tuple[str, str, bool]:
     create_test_set = True if create_test_set == 'y' else False
     return (project, component, create_test_set)
 
-def get_excel(proj_name:str, component_name: str):
-    """ Returns a dataframe """
-    target_file_name = f"[{proj_name}][{component_name}] SyQT Test case full.xlsx".lower()
-
-    target_path = ""
-    # Search recursively for the file
-    for filename in Path(SYQT_HOME_DIR).rglob(f"*.xlsx"):
-        if filename.name.lower() == target_file_name:
-            print(f"Detected file: {filename.name.title()}")
-            target_path = filename
-            break
-    else:
+def load_excel_index() -> dict:
+    """ Loads the on-disk workbook index. A fresh one is returned if the index
+        is missing, corrupted or was built for another `SYQT_HOME_DIR`.
+    """
+    try:
+        with open(SYQT_INDEX_FILE, 'r') as index_file:
+            index = json.load(index_file)
+            if index.get("root") == SYQT_HOME_DIR:
+                return index
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+    return {"root": SYQT_HOME_DIR, "dirs": {}, "files": {}}
+
+def save_excel_index(index: dict):
+    with open(SYQT_INDEX_FILE, 'w') as index_file:
+        json.dump(index, index_file)
+
+def refresh_excel_index(index: dict):
+    """ Brings the index up to date with `SYQT_HOME_DIR`. Every directory is
+        only stat'ed; its entries are re-listed only when its mtime changed
+        since the last scan.
+    """
+    dirs: dict = index["dirs"]
+    visited = set()
+    stack = [SYQT_HOME_DIR]
+    while stack:
+        dir_path = stack.pop()
+        try:
+            mtime = os.stat(dir_path).st_mtime_ns
+        except OSError:
+            continue
+        visited.add(dir_path)
+        entry = dirs.get(dir_path)
+        if entry is None or entry["mtime"] != mtime:
+            subdirs, workbooks = [], []
+            try:
+                with os.scandir(dir_path) as it:
+                    for e in it:
+                        if e.is_dir(follow_symlinks=False):
+                            subdirs.append(e.name)
+                        elif SYQT_FILE_PATTERN.match(e.name.lower()):
+                            workbooks.append(e.name)
+            except OSError:
+                continue
+            entry = dirs[dir_path] = {
+                "mtime": mtime, "subdirs": sorted(subdirs),
+                "workbooks": sorted(workbooks)
+            }
+        stack.extend(
+            os.path.join(dir_path, d) for d in reversed(entry["subdirs"]))
+
+    # Forget the directories that no longer exist
+    for dir_path in set(dirs) - visited:
+        del dirs[dir_path]
+
+    # Rebuild the [project][component] -> workbook path lookup
+    files = {}
+    for dir_path in sorted(dirs):
+        for name in dirs[dir_path]["workbooks"]:
+            m = SYQT_FILE_PATTERN.match(name.lower())
+            if m:
+                files.setdefault(m[1], {}).setdefault(
+                    m[2], os.path.join(dir_path, name))
+    index["files"] = files
+
+def find_excel(proj_name:str, component_name: str) -> Path:
+    """ Returns the path of the SyQT workbook for the project and component.
+        The cached location is used as long as the file still exists;
+        otherwise the index is refreshed first.
+    """
+    index = load_excel_index()
+    def lookup():
+        return index["files"].get(proj_name.lower(), {})\
+                             .get(component_name.lower())
+
+    target_path = lookup()
+    if not (target_path and Path(target_path).is_file()):
+        refresh_excel_index(index)
+        save_excel_index(index)
+        target_path = lookup()
+    if not target_path:
         raise FileNotFoundError(
             f"I couldn't find the required SyQT file 😢.\n"\
-            "The file should be located in '{SYQT_HOME_DIR}' with the "\
+            f"The file should be located in '{SYQT_HOME_DIR}' with the "\
             "following format: "\
                 "'[<model name>][<component name>] SyQT Test case full.xlsx'.")
-    try:
-        df = pd.read_excel(target_path, keep_default_na=False)
-        
-    except ValueError as e:
-        with tempfile.TemporaryDirectory() as tmpdir:
-            wb = open_workbook(target_path)
-            ws = wb.sheet_by_index(0)
-            with open(f"{tmpdir}/{target_path.name}", "w", newline='') as file:
-                writer = csv.writer(file)
-                for row_num in range(ws.nrows):
-                    # print(ws.row_values(row_num)[16])
-                    writer.writerow([d for d in ws.row_values(row_num)])
-            df = pd.read_csv(f'{tmpdir}/{target_path.name}', encoding="unicode_escape")
+    target_path = Path(target_path)
+    print(f"Detected file: {target_path.name.title()}")
+    return target_path
+
+def get_excel(proj_name:str, component_name: str):
+    """ Returns a dataframe """
+    return read_spreadsheet(
+        find_excel(proj_name, component_name), proj_name, component_name)[0]
+
+def read_excel_file(target_path: Path, usecols: list[int] | None = None) -> DataFrame:
+    """ Reads the first sheet of the workbook into a dataframe. Only the
+        columns at the `usecols` positions are loaded, if given. """
+    df, engine, elapsed = read_workbook(target_path, usecols)
+    print(f"Read the spreadsheet with the '{engine}' engine in {elapsed:.2f}s ⏱")
     return df
 
-def setup_df(df: DataFrame, proj_name:str, component_name: str) -> tuple[DataFrame, str]:
+def column_letter_to_index(letter: str) -> int:
+    """ Converts a spreadsheet column letter to a 0-based index, e.g. `AP` to
+        41. Returns -1 if the letter is invalid. """
+    letter = letter.strip().upper()
+    if not (letter.isascii() and letter.isalpha()):
+        return -1
+    index = 0
+    for c in letter:
+        index = index * 26 + ord(c) - ord('A') + 1
+    return index - 1
+
+def project_columns(
+        header: list, proj_name:str, component_name: str
+        ) -> tuple[list[int] | None, int]:
+    """ Locates the columns `setup_df` needs from the header row of the sheet:
+        `comments`, `name`, `id`, the anchor column and the results column at
+        `res_col_id`. Returns a tuple of the following:
+        0: The sorted column positions to load, or None to load everything
+        1: The position of the results column, or -1 if it must be detected
+    """
+    component = CONFIG["settings"][proj_name]["components"][component_name]
+    names = [str(col).lower() for col in header]
+    res_idx = column_letter_to_index(component["res_col_id"])
+    if not 0 <= res_idx < len(names):
+        return (None, -1)
+    usecols = {res_idx}
+    for c in ["comments", "name", "id", component["anchor_column"].lower()]:
+        if c not in names:
+            # Let `setup_df` report it or ask for it with the full sheet
+            return (None, res_idx)
+        usecols.add(names.index(c))
+    return (sorted(usecols), res_idx)
+
+def looks_like_results(values) -> bool:
+    """ Returns true if any of the values is a test result. """
+    for column_v in values:
+        try:
+            t_v = column_v.lower().strip()
+            if "pass" == t_v or "fail" == t_v \
+            or "blocked" == t_v or "na" == t_v \
+            or "hold" == t_v or "excl" == t_v:
+                return True
+        except AttributeError as e:
+            # Ignore NaNs
+            continue
+    return False
+
+def read_spreadsheet(
+        target_path: Path, proj_name:str, component_name: str
+        ) -> tuple[DataFrame, str]:
+    """ Reads only the columns of the sheet that `setup_df` needs. Returns the
+        dataframe and the name of the results column given by `res_col_id`.
+        The name is empty if the results column must be detected instead.
+    """
+    header = read_header(target_path)
+    if header is None:
+        header = list(read_workbook(target_path, nrows=0)[0].columns)
+    usecols, res_idx = project_columns(header, proj_name, component_name)
+    if res_idx == -1:
+        return (read_excel_file(target_path), "")
+
+    # calamine parses the whole sheet whatever `usecols` is, so the sheet is
+    # read once and the columns are picked from it
+    full = None
+    if usecols is not None and reader_engine(target_path) == "calamine":
+        full = read_excel_file(target_path)
+        df = full.iloc[:, usecols].copy()
+    else:
+        df = read_excel_file(target_path, usecols)
+    res_col = df.columns[usecols.index(res_idx) if usecols else res_idx]
+    if looks_like_results(df[res_col][:10]):
+        return (df, str(res_col))
+
+    res_col_id = CONFIG["settings"][proj_name]["components"][component_name]\
+                       ["res_col_id"]
+    print(f"⚠ WARNING: The column '{res_col_id}' doesn't appear to contain "\
+          "the results. Detecting the results column instead...")
+    if usecols is None:
+        return (df, "")
+    return (full if full is not None else read_excel_file(target_path), "")
+
+def read_header(target_path: Path) -> list | None:
+    """ Reads the header row of the first sheet without loading the rest of
+        it, with openpyxl's read-only mode or xlrd. Returns None if the
+        workbook can't be read that way. """
+    try:
+        if workbook_format(target_path) == "xlsx":
+            import openpyxl
+            wb = openpyxl.load_workbook(target_path, read_only=True, data_only=True)
+            try:
+                return list(next(
+                    wb.worksheets[0].iter_rows(max_row=1, values_only=True), ()))
+            finally:
+                wb.close()
+        ws = open_workbook(target_path, on_demand=True).sheet_by_index(0)
+        return ws.row_values(0) if ws.nrows else []
+    except Exception:
+        return None
+
+def reader_engine(target_path: Path) -> str | None:
+    """ The engine `read_workbook` tries first for the workbook. """
+    for engine, module, _ in READER_ENGINES[workbook_format(target_path)]:
+        if importlib.util.find_spec(module) is not None:
+            return engine
+    return None
+
+def workbook_format(target_path: Path) -> str:
+    """ Returns `xlsx` or `xls` based on the file signature. The extension is
+        not trusted as some reports are legacy workbooks saved as `.xlsx`.
+    """
+    with open(target_path, 'rb') as f:
+        signature = f.read(8)
+    if signature.startswith(b"PK\x03\x04"):
+        return "xlsx"
+    if signature == b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1":
+        return "xls"
+    raise ValueError(f"Unsupported spreadsheet format: {target_path.name}")
+
+def read_with_calamine(target_path: Path, usecols=None, nrows=None) -> DataFrame:
+    return pd.read_excel(
+        target_path, engine="calamine", keep_default_na=False,
+        usecols=usecols, nrows=nrows)
+
+def read_with_openpyxl(target_path: Path, usecols=None, nrows=None) -> DataFrame:
+    # pandas opens the workbook in openpyxl's read-only (streaming) mode
+    return pd.read_excel(
+        target_path, engine="openpyxl", keep_default_na=False,
+        usecols=usecols, nrows=nrows)
+
+def read_with_xlrd(target_path: Path, usecols=None, nrows=None) -> DataFrame:
+    """ Builds the dataframe straight from the raw cell values. This also
+        reads legacy sheets that `pd.read_excel` rejects. """
+    ws = open_workbook(target_path, on_demand=True).sheet_by_index(0)
+    if ws.nrows == 0:
+        return DataFrame()
+    end_row = ws.nrows if nrows is None else min(ws.nrows, nrows + 1)
+    columns = [
+        ws.col_values(col_num, 0, end_row)
+        for col_num in (range(ws.ncols) if usecols is None else usecols)
+    ]
+    df = DataFrame({i: col[1:] for i, col in enumerate(columns)})
+    df.columns = [col[0] for col in columns]
+    # Empty cells are treated as missing, as they were with the CSV fallback
+    return df.replace("", float("nan")).infer_objects()
+
+# Reader engines in order of preference for each workbook format.
+# Each entry is (engine name, module required, reader function).
+READER_ENGINES = {
+    "xlsx": [
+        ("calamine", "python_calamine", read_with_calamine),
+        ("openpyxl", "openpyxl", read_with_openpyxl),
+    ],
+    "xls": [
+        ("calamine", "python_calamine", read_with_calamine),
+        ("xlrd", "xlrd", read_with_xlrd),
+    ],
+}
+
+def read_workbook(
+        target_path: Path, usecols: list[int] | None = None, nrows: int | None = None
+        ) -> tuple[DataFrame, str, float]:
+    """ Reads the first sheet with the fastest engine available for the
+        workbook format. If an engine fails, the next one is tried.
+        `usecols` and `nrows` limit the columns and rows that are read.
+        Returns a tuple of the following:
+        0: The dataframe
+        1: The name of the engine used
+        2: The time it took to read the sheet in seconds
+    """
+    last_error = None
+    for engine, module, reader in READER_ENGINES[workbook_format(target_path)]:
+        if importlib.util.find_spec(module) is None:
+            continue
+        start = time.perf_counter()
+        try:
+            df = reader(target_path, usecols, nrows)
+        except Exception as e:
+            if DEBUG:
+                print(f"The '{engine}' engine couldn't read the spreadsheet: {e}")
+            last_error = e
+            continue
+        return (df, engine, time.perf_counter() - start)
+    raise ValueError(
+        f"None of the spreadsheet engines could read '{target_path.name}'. "\
+        f"{last_error or ''}")
+
+def workbook_digest(target_path: Path) -> str:
+    """ Returns the SHA-256 hex digest of the workbook content. """
+    h = hashlib.sha256()
+    with open(target_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def df_cache_key(digest: str, proj_name:str, component_name: str) -> str:
+    """ Combines the workbook digest with the `CONFIG` entries that affect
+        `setup_df`, so editing either one invalidates the cached result.
+    """
+    settings = CONFIG["settings"][proj_name]
+    component = settings["components"][component_name]
+    relevant = {
+        "cache_version": DF_CACHE_VERSION,
+        "version_pattern": settings["version_pattern"],
+        "res_col_id": component["res_col_id"],
+        "anchor_column": component["anchor_column"],
+    }
+    h = hashlib.sha256(digest.encode())
+    h.update(json.dumps(relevant, sort_keys=True).encode())
+    return h.hexdigest()
+
+def df_cache_path(key: str, proj_name:str, component_name: str) -> Path:
+    return Path(DF_CACHE_DIR) / f"[{proj_name}][{component_name}] {key}.json"
+
+def load_cached_df(
+        key: str, proj_name:str, component_name: str
+        ) -> tuple[DataFrame, str] | None:
+    """ Returns the cached `(df, res_col)` of `setup_df`, if any. A cache
+        entry that can't be read for any reason is ignored, so the workbook
+        is read again. """
+    try:
+        with open(df_cache_path(key, proj_name, component_name), 'r', encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached["version"] != DF_CACHE_VERSION:
+            return None
+        df = pd.read_json(
+            io.StringIO(cached["df"]), orient="split",
+            dtype=False, convert_dates=False)
+        return (df, cached["res_col"])
+    except Exception:
+        return None
+
+def save_cached_df(
+        key: str, proj_name:str, component_name: str, df: DataFrame, res_col: str):
+    """ Stores the result of `setup_df` as JSON, which is only ever parsed
+        as data. Older entries of the same project and component are
+        removed. """
+    target = df_cache_path(key, proj_name, component_name)
+    target.parent.mkdir(exist_ok=True)
+    for old in target.parent.iterdir():
+        if old.name.startswith(f"[{proj_name}][{component_name}] ") and old != target:
+            old.unlink(missing_ok=True)
+    with open(target, 'w', encoding="utf-8") as f:
+        json.dump({
+            "version": DF_CACHE_VERSION,
+            "res_col": res_col,
+            "df": df.to_json(orient="split"),
+        }, f)
+
+def load_spreadsheet(
+        proj_name:str, component_name: str,
+        target_path: Path | None = None, interactive=True
+        ) -> tuple[DataFrame, str]:
+    """ Returns the cleaned dataframe and the results column name. An
+        unchanged spreadsheet is served from the cache without being parsed
+        or validated again. The workbook is looked up unless `target_path`
+        is given. See `setup_df` for `interactive`.
+    """
+    if target_path is None:
+        target_path = find_excel(proj_name, component_name)
+    digest = workbook_digest(target_path)
+    cached = load_cached_df(
+        df_cache_key(digest, proj_name, component_name), proj_name, component_name)
+    if cached is not None:
+        df, res_col = cached
+        print("The spreadsheet hasn't changed since the last run. "\
+              "Using the cached results ⚡")
+        print(f"Detected results column: '{res_col.title()}'")
+        print(f"Total number of test cases (after filtering) 🔬: {df.shape[0]}")
+        return cached
+
+    df, res_col = read_spreadsheet(target_path, proj_name, component_name)
+    df, res_col = setup_df(df, proj_name, component_name, res_col, interactive)
+    # The key is computed again as `setup_df` may have updated the CONFIG
+    save_cached_df(
+        df_cache_key(digest, proj_name, component_name),
+        proj_name, component_name, df, res_col)
+    return (df, res_col)
+
+def extract_ticket_ids(comments: pd.Series) -> pd.Series:
+    """ Returns the ticket ids linked in each comment as a list, in the order
+        they appear. Repeated links are only listed once. """
+    matches = comments.str.extractall(TICKET_LINK_PATTERN)[0]
+    tickets = {}
+    for row, ticket in zip(matches.index.get_level_values(0), matches.to_numpy()):
+        ids = tickets.setdefault(row, [])
+        if ticket not in ids:
+            ids.append(ticket)
+    return pd.Series(
+        [tickets.get(row, []) for row in comments.index],
+        index=comments.index, dtype=object)
+
+def violation(rule: str, message: str, rows=(), column="") -> dict:
+    """ Returns an entry of the validation report. `rows` are the row numbers
+        as shown on the spreadsheet. """
+    return {
+        "rule": rule,
+        "column": column,
+        "rows": [int(row) for row in rows],
+        "message": message,
+    }
+
+def raise_validation_report(
+        violations: list[dict], proj_name:str, component_name: str, res_col: str):
+    """ Saves all the violations found in the spreadsheet into a JSON report
+        and raises an `IncompleteColumnError` listing them. """
+    report_path = Path(f"[{proj_name}][{component_name}] validation report.json")
+    with open(report_path, 'w') as report_file:
+        json.dump({
+            "project": proj_name,
+            "component": component_name,
+            "results_column": res_col,
+            "violations": violations,
+        }, report_file, indent=4)
+
+    lines = []
+    for v in violations[:VALIDATION_REPORT_MAX_LINES]:
+        where = ""
+        if v["rows"]:
+            label = "Row" if len(v["rows"]) == 1 else "Rows"
+            where = f"{label} {', '.join(str(row) for row in v['rows'])} | "
+        lines.append(f"  - {where}{v['message']}")
+    if len(violations) > VALIDATION_REPORT_MAX_LINES:
+        lines.append(f"  ... and {len(violations) - VALIDATION_REPORT_MAX_LINES} more.")
+    raise IncompleteColumnError(
+        f"I found {len(violations)} problem(s) in your spreadsheet. "\
+        "Please fix them 👀\n" + "\n".join(lines) + \
+        f"\nThe full report is saved to '{report_path.resolve()}'.")
+
+def setup_df(
+        df: DataFrame, proj_name:str, component_name: str, res_col_hint="",
+        interactive=True
+        ) -> tuple[DataFrame, str]:
     """ Cleans the dataframe on project basis and returns the version column \
         name on the sheet. For example, `N401.02 <description>`.\
         The following projects are filtered by empty corresponding column \
         value. 
         For NAR Classic:
             * NAV | Steps.Expected result
+        `res_col_hint` is the results column located by `res_col_id`, if any.
+        Otherwise, the results column is detected from the values.
+        If `interactive` is false, the user is never prompted for fixes.
+        Every problem in the spreadsheet is collected before raising an
+        `IncompleteColumnError`, along with a JSON report of them.
     """
+    violations = []
+
     # Check if the spreadsheet has the essential columns
     df.columns = [col.lower() for col in df.columns]
     required_columns = ["comments", "name", "id"]
     for c in required_columns:
         if c not in df.columns:
-            raise IncompleteColumnError(
-                f"You need to include the column '{c}' in the spreadsheet."
-            )
+            violations.append(violation(
+                "missing_column",
+                f"You need to include the column '{c}' in the spreadsheet.",
+                column=c))
         
     # Check if every row contains a valid result
     # If not, inform the user to finish the result and quit the program
-    res_col = ""
-    for col_name in df.columns:
-        if df[col_name].dtype == "object":
-            for column_v in df[col_name][:10]:
-                try:
-                    t_v = column_v.lower().strip()
-                    if "pass" == t_v or "fail" == t_v \
-                    or "blocked" == t_v or "na" == t_v \
-                    or "hold" == t_v or "excl" == t_v:
-                        print(f"Detected results column: '{col_name.title()}'")
-                        res_col = col_name
-                        break
-                except AttributeError as e:
-                    # Ignore NaNs
-                    continue
-            else:
-                continue
-            break
+    res_col = res_col_hint.lower()
+    if res_col not in df.columns:
+        for col_name in df.columns:
+            if df[col_name].dtype == "object" and \
+               looks_like_results(df[col_name][:10]):
+                res_col = col_name
+                break
         else:
-            IncompleteColumnError("Couldn't find the appropriate result column. Check your spreadsheet!")
+            res_col = ""
+            violations.append(violation(
+                "missing_results_column",
+                "Couldn't find the appropriate result column. Check your spreadsheet!"))
+
+    # Filter all the rows that do not have a NAME by using the
+    # anchor column
+    anchor_col = CONFIG["settings"][proj_name]["components"][component_name]\
+                       ["anchor_column"].lower()
+    if anchor_col not in df.columns:
+        if not interactive:
+            violations.append(violation(
+                "missing_anchor_column",
+                f"The anchor column '{anchor_col}' is not in the spreadsheet.",
+                column=anchor_col))
+        else:
+            while True:
+                t = input("Invalid anchor column. Enter a valid anchor column: ").lower()
+                if t in df.columns:
+                    CONFIG["settings"][proj_name]["components"][component_name]\
+                          ["anchor_column"] = anchor_col = t
+                    save_config(CONFIG)
+                    break
+
+    # The rows can't be checked without these columns
+    if violations:
+        raise_validation_report(violations, proj_name, component_name, res_col)
+    print(f"Detected results column: '{res_col.title()}'")
        
     # Ensure that the results column name contains the version number
     pattern = re.compile(CONFIG["settings"][proj_name]["version_pattern"])
     if len(res_col) < 7:
-        raise IncompleteColumnError("Your results column needs to include full version info.")
-    version_info = res_col[:7].upper()
-    if not pattern.match(version_info):
-        raise IncompleteColumnError(
+        violations.append(violation(
+            "results_column_version",
+            "Your results column needs to include full version info.",
+            column=res_col))
+    elif not pattern.match(res_col[:7].upper()):
+        violations.append(violation(
+            "results_column_version",
             f"The column name should start with the version number in the "\
             "following format: "\
-            "{CONFIG['settings'][proj_name]['version_pattern'][0]}XXX.XX"
-        )
-    #TODO
+            f"{CONFIG['settings'][proj_name]['version_pattern'][0]}XXX.XX",
+            column=res_col))
 
-    # Filter all the rows that do not have a NAME by using the
-    # anchor column
-    anchor_col = CONFIG["settings"][proj_name]["components"][component_name]\
-                       ["anchor_column"].lower()
-    if anchor_col not in df.columns:
-        while True:
-            t = input("Invalid anchor column. Enter a valid anchor column: ").lower()
-            if t in df.columns:
-                CONFIG["settings"][proj_name]["components"][component_name]\
-                      ["anchor_column"] = anchor_col = t
-                save_config(CONFIG)
-                break
-            
+    # Number the rows as they are on the spreadsheet (after the header row)
+    df.index = df.index + 2
     df.dropna(axis=0, subset=anchor_col, inplace=True)
-    df.reset_index(drop=True, inplace=True)
     
-    def filter_comments(d): 
-        text = str(d).strip()
-        if len(text) == 0:
-            return 'nan'
-        else: 
-            return text
-        
-    def check_id(d):
-        id = str(d).strip().split('.')[0]
-        if id.isdigit():
-            return id
-        else:
-            raise IncompleteColumnError(
-                f"The ID contains non-numerical values. Please fix this. "\
-                "The id: {id}")
-
     # Perform additional house keeping, cleaning data, etc
     # Verify if the number of items seem correct.
-    df["name"] = df["name"].apply(lambda d:str(d).lower().strip())
-    df["comments"] = df["comments"].apply(lambda d:filter_comments(d))
-    df[res_col] = df[res_col].apply(lambda d:str(d).lower())
-    df["id"] = df["id"].apply(lambda d:check_id(d))
+    df["name"] = df["name"].astype(str).str.lower().str.strip()
+    comments = df["comments"].astype(str).str.strip()
+    df["comments"] = comments.mask(comments.str.len() == 0, 'nan')
+    df[res_col] = df[res_col].astype(str).str.lower()
+    ids = df["id"].astype(str).str.strip().str.split('.', n=1).str[0]
+    for row, id in ids.loc[~ids.str.isdigit()].items():
+        violations.append(violation(
+            "invalid_id",
+            f"The ID contains non-numerical values. Please fix this. The id: {id}",
+            [row], "id"))
+    df["id"] = ids
     complete_set = set(["pass", "fail", "blocked", "na", "excl"])
 
-    err_msg = ""
-    u = set(df[res_col].unique())
-    if not u.issubset(complete_set):
-        raise IncompleteColumnError(
-            "The result column doesn't appear to be complete. Please check this 👀.\n"\
-            "You should only include pass, fail, blocked, na, excl values in "\
-            "your results column."
-                                    )
+    for row, result in df[res_col].loc[~df[res_col].isin(complete_set)].items():
+        violations.append(violation(
+            "invalid_result",
+            f"'{result}' is not a result. You should only include pass, fail, "\
+            "blocked, na, excl values in your results column.",
+            [row], res_col))
+
     res_n = df[res_col].count()
     filter_col_n = df[anchor_col].count()
     name_n = df["name"].count()
@@ -399,77 +1044,725 @@ def setup_df(df: DataFrame, proj_name:str, component_name: str) -> tuple[DataFra
         err_msg = "The number of results, names, id, and expected results "\
                   "column do not match!"
         if name_n < filter_col_n or name_n < res_n:
-            err_msg += "\nThe name column appears to be missing some entries."
-        raise IncompleteColumnError(err_msg)
+            err_msg += " The name column appears to be missing some entries."
+        violations.append(violation("column_count_mismatch", err_msg))
     
     # Filter by value of the column, res_col, where it's not excluded
     df = df.loc[df[res_col] != "excl"]
 
     # Check for dupliate 'name' entries
     df["name_dup"] = df["name"].duplicated("first")
-    df_dup = df["name"].loc[df["name_dup"] == True]
+    df_dup = df["name"].loc[df["name_dup"]]
 
     # If duplicates exist, warn the user.
     if df_dup.shape[0] > 0:
         print("⚠ WARNING: There are duplicate test cases in this spreadsheet. ")
         print(df_dup)
-        for name in df_dup.unique():
-            t_df = df.loc[df["name"] == name]
-            if t_df[res_col].unique().size > 1 or \
-               t_df["comments"].unique().size > 1:
-                raise IncompleteColumnError(f"The duplicate test cases should have the same results and the comments. Test case: {name}")
-
-    # Ensure all failed test cases include a comment with a link
-    # Ensure all blocked and failed test cases include a comment. Failed test cases 
+        dup_names = df_dup.unique()
+        df_dup_all = df.loc[df["name"].isin(dup_names)]
+        n_unique = df_dup_all.groupby("name", sort=False)[[res_col, "comments"]]\
+                             .nunique()
+        inconsistent = set(n_unique.index[(n_unique > 1).any(axis=1)])
+        for name in dup_names:
+            if name in inconsistent:
+                violations.append(violation(
+                    "inconsistent_duplicate",
+                    "The duplicate test cases should have the same results and "\
+                    f"the comments. Test case: {name}",
+                    df_dup_all.index[df_dup_all["name"] == name], "name"))
+
+    # Ensure all blocked and failed test cases include a comment.
+    # Failed test cases also need a ticket link.
     df_blocked = df.loc[(df[res_col] == "blocked") & (df["comments"] == 'nan')]
-    if df_blocked.shape[0] > 0:
-        print("Blocked TCs are missing associated comments.")
-        print(df_blocked["name"])
-        raise IncompleteColumnError
+    for row, name in df_blocked["name"].items():
+        violations.append(violation(
+            "blocked_without_comment",
+            f"Blocked TC is missing associated comments: {name}",
+            [row], "comments"))
 
+    df["tickets"] = extract_ticket_ids(df["comments"])
     df_fails = df.loc[df[res_col] == "fail"]
-    fails = []
-    for row in df_fails.iterrows():
-        if len(url_extractor(row[1]["comments"])) == 0:
-            fails.append(row[1]["name"])
-    if len(fails) > 0:
-        print("You are missing ticket links for failed tc's. 😢")
-        for i, x in enumerate(fails,1):
-            print(f"{i}. {x}")
-        raise IncompleteColumnError
+    fails = df_fails["name"].loc[df_fails["tickets"].str.len() == 0]
+    for row, name in fails.items():
+        violations.append(violation(
+            "fail_without_link",
+            f"You are missing ticket links for this failed tc 😢: {name}",
+            [row], "comments"))
+
+    if violations:
+        raise_validation_report(violations, proj_name, component_name, res_col)
      
     print(f"Total number of test cases (after filtering) 🔬: {df.shape[0]}")  
     return (df, res_col)
 
+def validate_component(job: tuple) -> tuple[str, str, bool, str, float]:
+    """ Process pool worker for `validate_all`. Loads and validates a single
+        spreadsheet without prompting the user. Returns a tuple of the following:
+        0: The project name
+        1: The component name
+        2: True if the spreadsheet is valid
+        3: The summary if valid. Otherwise, the error and the output that led to it
+        4: The time it took in seconds
+    """
+    global CONFIG
+    global SYQT_HOME_DIR
+    proj_name, component_name, target_path, CONFIG, SYQT_HOME_DIR = job
+    start = time.perf_counter()
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            df, res_col = load_spreadsheet(
+                proj_name, component_name, target_path, interactive=False)
+        return (proj_name, component_name, True,
+                f"{df.shape[0]} test cases | '{res_col.title()}'",
+                time.perf_counter() - start)
+    except Exception as e:
+        return (proj_name, component_name, False,
+                f"{output.getvalue().strip()}\n{e}".strip(),
+                time.perf_counter() - start)
+
+def validate_all(CONFIG) -> bool:
+    """ Validates the spreadsheets of every project and component in the
+        CONFIG in parallel, then prints a summary. Returns true if all of
+        them are valid.
+    """
+    start = time.perf_counter()
+    results = {}
+    jobs = []
+    for proj_name, product_settings in CONFIG["settings"].items():
+        for component_name in product_settings["components"]:
+            results[(proj_name, component_name)] = None
+            try:
+                target_path = find_excel(proj_name, component_name)
+            except FileNotFoundError as e:
+                results[(proj_name, component_name)] = \
+                    (proj_name, component_name, False, str(e), 0.0)
+                continue
+            jobs.append((
+                proj_name, component_name, target_path, CONFIG, SYQT_HOME_DIR))
+
+    print(f"Validating {len(jobs)} spreadsheets... This may take a moment ⌛")
+    if jobs:
+        with ProcessPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 1)) as pool:
+            for res in pool.map(validate_component, jobs):
+                results[(res[0], res[1])] = res
+
+    print("\n===== Validation summary =====")
+    results = list(results.values())
+    for proj_name, component_name, valid, summary, elapsed in results:
+        mark = "✅" if valid else "❌"
+        print(f"{mark} {proj_name.upper()} - {component_name.upper()} ({elapsed:.2f}s)")
+        for line in summary.splitlines():
+            print(f"    {line}")
+    n_valid = sum(1 for r in results if r[2])
+    print(f"{n_valid}/{len(results)} spreadsheets are valid. "\
+          f"Took {time.perf_counter() - start:.2f}s in total.")
+    return n_valid == len(results)
+
+def build_run_plan(df: DataFrame, res_col: str) -> RunPlan:
+    """ Builds the run plan from the dataframe cleaned by `setup_df`. The
+        results are stored as categories and the strings are interned, so
+        repeated values share a single object.
+    """
+    results = df[res_col].astype("category")
+    categories = [sys.intern(str(c)) for c in results.cat.categories]
+    records = [
+        RunRecord(
+            sys.intern(id), sys.intern(name), categories[code],
+            sys.intern(comment), tuple(tickets))
+        for id, name, code, comment, tickets in zip(
+            df["id"], df["name"], results.cat.codes,
+            df["comments"], df["tickets"])
+    ]
+    return RunPlan(records, res_col)
+
 def configure_webdriver() -> webdriver.Chrome:
     options = webdriver.ChromeOptions()
     options.add_experimental_option('excludeSwitches', ['enable-logging'])
-    return webdriver.Chrome(options=options)
+    if HEADLESS:
+        options.add_argument("--headless=new")
+        # The tree and the dialogs need a desktop-sized layout
+        options.add_argument("--window-size=1920,1080")
+    if CB_PROFILE_DIR:
+        options.add_argument(f"--user-data-dir={Path(CB_PROFILE_DIR).resolve()}")
+
+    policy = RESOURCE_POLICIES[RESOURCE_POLICY]
+    # "eager" returns from `driver.get` once the DOM is ready
+    options.page_load_strategy = policy["page_load_strategy"]
+    if not policy["images"]:
+        options.add_experimental_option(
+            "prefs", {"profile.managed_default_content_settings.images": 2})
+
+    driver = webdriver.Chrome(options=options)
+    # In-page waits (`wait_for_dom`) time out on their own
+    driver.set_script_timeout(SCRIPT_TIMEOUT)
+    setup_tab(driver)
+    return driver
+
+def setup_tab(driver: webdriver.Chrome) -> None:
+    """ Sets up the current tab through CDP, which only applies to that tab,
+        so call it again after switching to a new one.
+    """
+    # Track the AJAX requests of every page from its very first script
+    driver.execute_cdp_cmd(
+        "Page.addScriptToEvaluateOnNewDocument", {"source": NET_TRACKER_JS})
+
+    blocked_urls = RESOURCE_POLICIES[RESOURCE_POLICY]["blocked_urls"]
+    if blocked_urls:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_urls})
+
+PAGE_LOAD_STATS_JS = """
+const nav = performance.getEntriesByType("navigation")[0];
+if (!nav) {
+    return null;
+}
+const resources = performance.getEntriesByType("resource");
+return {
+    dom_ready: nav.domContentLoadedEventEnd,
+    load: nav.loadEventEnd,
+    requests: resources.length + 1,
+    bytes: resources.reduce((n, r) => n + r.transferSize, nav.transferSize),
+};
+"""
+
+def log_page_load(driver: webdriver.Chrome, page: str) -> None:
+    """ Prints how long the current page took to load and how much it
+        downloaded, from the Navigation Timing API. Run once per
+        CB_RESOURCE_POLICY to compare them. Only in DEBUG.
+    """
+    if not DEBUG:
+        return
+    try:
+        stats = driver.execute_script(PAGE_LOAD_STATS_JS)
+    except selenium_exceptions.JavascriptException as e:
+        stats = None
+    if not stats:
+        print(f"📊 [{RESOURCE_POLICY}] {page}: no timing available")
+        return
+    # With the "eager" strategy, the page may still be loading the rest
+    load = f"{stats['load']:.0f} ms" if stats['load'] else "still loading"
+    print(f"📊 [{RESOURCE_POLICY}] {page}: DOM ready in "\
+          f"{stats['dom_ready']:.0f} ms, loaded in {load}, "\
+          f"{stats['requests']} requests, {stats['bytes'] / 1024:.0f} KB")
+
+# Counts the XHR/fetch requests in flight for `wait_till_loading_fin`.
+# Installed through CDP so it runs before any script of the page, iframes
+# included.
+NET_TRACKER_JS = """
+(function () {
+    if (window.__cbNet) {
+        return;
+    }
+    const net = {pending: 0, last: performance.now(), listeners: new Set()};
+    window.__cbNet = net;
+    function change(delta) {
+        net.pending = Math.max(0, net.pending + delta);
+        net.last = performance.now();
+        net.listeners.forEach((listener) => listener());
+    }
+
+    const fetch = window.fetch;
+    if (fetch) {
+        window.fetch = function () {
+            change(1);
+            return fetch.apply(this, arguments).finally(() => change(-1));
+        };
+    }
+    const send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        change(1);
+        this.addEventListener("loadend", () => change(-1), {once: true});
+        try {
+            return send.apply(this, arguments);
+        } catch (e) {
+            change(-1);
+            throw e;
+        }
+    };
+})();
+"""
+# No request in flight for this long counts as "finished loading"
+NETWORK_IDLE_MS = 300
+
+# The helper library injected into each page once. It is injected again when
+# a call finds it missing, e.g. after navigation. Bump the version whenever
+# the library changes so stale copies get replaced.
+CB_HELPERS_VERSION = 10
+# Upper bound for async scripts. In-page waits use their own timeouts.
+SCRIPT_TIMEOUT = 300
+CB_HELPERS_JS = """
+window.__cbHelpers = (function (version) {
+    // Bumped on every DOM change to invalidate the text indexes
+    let generation = 0;
+    const observer = new MutationObserver(() => { generation += 1; });
+    observer.observe(
+        document.documentElement,
+        {childList: true, subtree: true, characterData: true});
+    const indexes = new WeakMap();
+
+    // Returns [element, lowercased text] of every `nodeType` element under
+    // `root`, root included, in document order. This is the order the old
+    // recursive searches visited the elements in.
+    function textIndex(root, nodeType) {
+        if (observer.takeRecords().length > 0) {
+            generation += 1;
+        }
+        let byType = indexes.get(root);
+        if (byType === undefined) {
+            byType = new Map();
+            indexes.set(root, byType);
+        }
+        let index = byType.get(nodeType);
+        if (index === undefined || index.generation !== generation) {
+            let nodes = Array.from(root.querySelectorAll(nodeType));
+            if (root.nodeName.toLowerCase() === nodeType) {
+                nodes.unshift(root);
+            }
+            index = {
+                generation: generation,
+                entries: nodes.map((e) => [e, e.textContent.toLowerCase()]),
+            };
+            byType.set(nodeType, index);
+        }
+        return index.entries;
+    }
+
+    function findIn(root, text, nodeType, opts) {
+        let needle = text.toLowerCase();
+        for (let [elem, content] of textIndex(root, nodeType)) {
+            let matched = opts.exact ? content.trim() === needle
+                                     : content.includes(needle);
+            if (matched && !(opts.exclClass && elem.classList.contains(opts.exclClass))) {
+                return elem;
+            }
+        }
+        return null;
+    }
+
+    function getRoot(selector, nth) {
+        let root = (nth === undefined || nth === null)
+            ? document.querySelector(selector)
+            : document.querySelectorAll(selector)[nth];
+        if (!root) {
+            throw new Error(`No element matches the selector: ${selector}`);
+        }
+        return root;
+    }
+
+    // Finds the first `nodeType` element under `selector` whose text includes
+    // (or equals, with `exact`) `text`. Options:
+    //   exact     - Compare the trimmed text for equality
+    //   exclClass - Skip elements with this class
+    //   nth       - Use the nth element matching `selector` as the root
+    //   setAttr   - [key, value] to set on the element found
+    //   toggle    - Selector under the root to click before clicking
+    //   click     - Click the element. Throws if there is none
+    //   attr      - Return [element, value of the attribute] instead
+    function find(selector, text, nodeType, opts) {
+        opts = opts || {};
+        let root = getRoot(selector, opts.nth);
+        let elem = findIn(root, text, nodeType, opts);
+        if (elem === null) {
+            if (opts.click) {
+                throw new Error(`No '${nodeType}' element with the text: ${text}`);
+            }
+            return null;
+        }
+        if (opts.setAttr) {
+            elem.setAttribute(opts.setAttr[0], opts.setAttr[1]);
+        }
+        if (opts.click) {
+            if (opts.toggle) {
+                root.querySelector(opts.toggle).click();
+            }
+            elem.click();
+            return null;
+        }
+        if (opts.attr) {
+            return [elem, elem.getAttribute(opts.attr)];
+        }
+        return elem;
+    }
+
+    // Finds the first visible row of the table with a `nodeType` element
+    // whose trimmed text includes `text`, and checks the row's checkbox.
+    // Returns [row index, element], followed by the value of `opts.attr` if
+    // given, or -1 if there is no such row.
+    function tableSearch(tableSelector, text, nodeType, opts) {
+        opts = opts || {};
+        let rows = document.querySelectorAll(`${tableSelector} tbody > tr`);
+        for (let i = 0; i < rows.length; i++) {
+            let elem = findIn(rows[i], text, nodeType, {});
+            if (elem === null || rows[i].style.display.toLowerCase().includes("none")) {
+                continue;
+            }
+            if (opts.setAttr) {
+                elem.setAttribute(opts.setAttr[0], opts.setAttr[1]);
+            }
+            let checkbox = rows[i].querySelector('input');
+            if (checkbox !== null && !checkbox.checked) {
+                checkbox.click();
+            }
+            return opts.attr ? [i, elem, elem.getAttribute(opts.attr)] : [i, elem];
+        }
+        return -1;
+    }
+
+    // Checks the row of every text like `tableSearch` does, in one call.
+    // Returns the texts without a row.
+    function checkRows(tableSelector, nodeType, texts) {
+        return texts.filter((text) => tableSearch(
+            tableSelector, text, nodeType,
+            {setAttr: ["checked", "true"]}) === -1);
+    }
+
+    // Selects the nodes with the ids on the jstree at `treeSelector`,
+    // replacing the current selection. Returns [selected ids, missing ids].
+    function selectTreeNodes(treeSelector, ids) {
+        let tree = window.jQuery(treeSelector).jstree(true);
+        if (!tree) {
+            throw new Error(`No jstree instance at: ${treeSelector}`);
+        }
+        let found = ids.filter((id) => tree.get_node(id));
+        tree.deselect_all(true);
+        tree.select_node(found, false, true);
+        let selected = found.filter((id) => tree.is_selected(id));
+        let chosen = new Set(selected);
+        let missing = ids.filter((id) => !chosen.has(id));
+        return [selected, missing];
+    }
+
+    // Opens the folders of the jstree at `treeSelector` that lead to the
+    // targets, [id, name] pairs. A name is looked up with the tree's
+    // server-side search, which loads only the ancestors of its matches,
+    // and the other targets of those folders come along. The folders
+    // leading to the loaded targets are then opened, since the clicks on
+    // the tree need their links rendered. Trees without a search are
+    // opened level by level until every id is loaded. A search or a folder
+    // that doesn't report back within `stepMs` is given up on.
+    // Resolves with the ids that are still not on the tree.
+    async function openTreeFor(treeSelector, targets, stepMs) {
+        let tree = window.jQuery(treeSelector).jstree(true);
+        if (!tree) {
+            throw new Error(`No jstree instance at: ${treeSelector}`);
+        }
+        let pending = new Map(targets);
+        function dropLoaded() {
+            for (let id of pending.keys()) {
+                if (tree.get_node(id)) {
+                    pending.delete(id);
+                }
+            }
+        }
+        // Runs `start` and settles once `done` is called, or after `stepMs`
+        function step(start) {
+            return new Promise((resolve) => {
+                let timer = setTimeout(resolve, stepMs);
+                start(() => {
+                    clearTimeout(timer);
+                    resolve();
+                });
+            });
+        }
+        function open(node) {
+            if (tree.is_open(node) && tree.is_loaded(node)) {
+                return Promise.resolve();
+            }
+            return step((done) => tree.open_node(node, done, false));
+        }
+        dropLoaded();
+
+        let search = tree.settings.search;
+        if (search && search.ajax) {
+            // Every search clears the last one, which closes the folders it
+            // opened, so they are opened again below
+            for (let [id, name] of Array.from(pending)) {
+                if (!pending.has(id)) {
+                    continue;
+                }
+                await step((done) => {
+                    window.jQuery(treeSelector).one("search.jstree", done);
+                    tree.search(name);
+                });
+                dropLoaded();
+            }
+            tree.clear_search();
+
+            // The ancestors of the loaded targets, outermost first
+            let depths = new Map();
+            for (let [id] of targets) {
+                if (!tree.get_node(id)) {
+                    continue;
+                }
+                tree.get_path(id, false, true).slice(0, -1).forEach(
+                    (ancestor, depth) => depths.set(ancestor, depth));
+            }
+            let maxDepth = Math.max(-1, ...depths.values());
+            for (let depth = 0; depth <= maxDepth; depth++) {
+                let level = Array.from(depths.keys()).filter(
+                    (ancestor) => depths.get(ancestor) === depth);
+                await Promise.all(level.map((ancestor) => open(tree.get_node(ancestor))));
+            }
+            return Array.from(pending.keys());
+        }
+
+        let level = tree.get_node('#').children.map((id) => tree.get_node(id));
+        while (pending.size > 0 && level.length > 0) {
+            let folders = level.filter((node) => tree.is_parent(node));
+            await Promise.all(folders.map(open));
+            dropLoaded();
+            level = folders.flatMap(
+                (node) => tree.get_node(node.id).children.map((id) => tree.get_node(id)));
+        }
+        return Array.from(pending.keys());
+    }
+
+    function isVisible(elem) {
+        return elem.getClientRects().length > 0
+            && window.getComputedStyle(elem).visibility !== "hidden";
+    }
+
+    // Returns what `waitFor` resolves with if `cond` holds now, else null
+    function check(cond) {
+        let elems = document.querySelectorAll(cond.selector);
+        if (cond.gone) {
+            return Array.from(elems).some(isVisible) ? null : true;
+        }
+        for (let elem of elems) {
+            if ((cond.visible && !isVisible(elem))
+                || (cond.hasClass && !elem.classList.contains(cond.hasClass))) {
+                continue;
+            }
+            if (cond.text === undefined) {
+                return elem;
+            }
+            let found = findIn(elem, cond.text, cond.nodeType, cond);
+            if (found !== null) {
+                return found;
+            }
+        }
+        return null;
+    }
+
+    // Resolves as soon as the condition holds, re-checking it on every DOM
+    // mutation, or with null after `timeoutMs`. Conditions:
+    //   selector - Elements to check. Resolves with the first that matches
+    //   visible  - The element must be visible
+    //   hasClass - The element must have this class
+    //   text     - Resolves with the `nodeType` element under the element
+    //              whose text includes (or equals, with `exact`) `text`
+    //   gone     - Resolves with true once no element is visible
+    function waitFor(cond, timeoutMs) {
+        return new Promise((resolve) => {
+            let res = check(cond);
+            if (res !== null) {
+                resolve(res);
+                return;
+            }
+            let timer = null;
+            const obs = new MutationObserver(() => {
+                let res = check(cond);
+                if (res !== null) {
+                    obs.disconnect();
+                    clearTimeout(timer);
+                    resolve(res);
+                }
+            });
+            obs.observe(document.documentElement, {
+                childList: true, subtree: true,
+                attributes: true, characterData: true,
+            });
+            timer = setTimeout(() => {
+                obs.disconnect();
+                resolve(null);
+            }, timeoutMs);
+        });
+    }
+
+    // Resolves with true once no request has been in flight for `idleMs`,
+    // right away if the page is already idle that long, or with false after
+    // `timeoutMs`. Resolves with null on pages without the network tracker.
+    function networkIdle(idleMs, timeoutMs) {
+        const net = window.__cbNet;
+        if (!net) {
+            return Promise.resolve(null);
+        }
+        return new Promise((resolve) => {
+            let idleTimer = null;
+            const deadline = setTimeout(() => finish(false), timeoutMs);
+            function finish(res) {
+                clearTimeout(idleTimer);
+                clearTimeout(deadline);
+                net.listeners.delete(arm);
+                resolve(res);
+            }
+            // Restarted on every request that starts or ends
+            function arm() {
+                clearTimeout(idleTimer);
+                if (net.pending === 0) {
+                    let quiet = performance.now() - net.last;
+                    idleTimer = setTimeout(
+                        () => finish(true), Math.max(0, idleMs - quiet));
+                }
+            }
+            net.listeners.add(arm);
+            arm();
+        });
+    }
+
+    // Replaces the value of an input or textarea at once and fires the
+    // events typing would. Returns false for any other element.
+    function setText(elem, text) {
+        if (!(elem instanceof HTMLInputElement
+              || elem instanceof HTMLTextAreaElement)) {
+            return false;
+        }
+        elem.focus();
+        // The native setter, so scripts tracking the value notice the change
+        let proto = elem instanceof HTMLInputElement
+            ? HTMLInputElement.prototype : HTMLTextAreaElement.prototype;
+        Object.getOwnPropertyDescriptor(proto, "value").set.call(elem, text);
+        for (let type of ["input", "keyup", "change"]) {
+            let event = type === "keyup"
+                ? new KeyboardEvent(type, {bubbles: true})
+                : new Event(type, {bubbles: true});
+            elem.dispatchEvent(event);
+        }
+        return true;
+    }
+
+    // Returns [name, selector, found, needed] of every [name, selector,
+    // needed] matching fewer than `needed` elements. `found` is -1 for an
+    // invalid selector.
+    function probe(selectors) {
+        let failed = [];
+        for (let [name, selector, needed] of selectors) {
+            let found;
+            try {
+                found = document.querySelectorAll(selector).length;
+            } catch (e) {
+                found = -1;
+            }
+            if (found < needed) {
+                failed.push([name, selector, found, needed]);
+            }
+        }
+        return failed;
+    }
+
+    return {
+        version: version, find: find, tableSearch: tableSearch,
+        checkRows: checkRows, selectTreeNodes: selectTreeNodes, openTreeFor: openTreeFor,
+        waitFor: waitFor, networkIdle: networkIdle, setText: setText,
+        probe: probe,
+    };
+})(arguments[0]);
+"""
+CB_HELPERS_MISSING = "cb-helpers-missing"
+CB_HELPERS_CALL = f"""
+const helpers = window.__cbHelpers;
+if (!helpers || helpers.version !== arguments[0]) {{
+    return "{CB_HELPERS_MISSING}";
+}}
+return helpers[arguments[1]](...arguments[2]);
+"""
+
+CB_HELPERS_CALL_ASYNC = f"""
+const [version, name, args] = arguments;
+const done = arguments[arguments.length - 1];
+const helpers = window.__cbHelpers;
+if (!helpers || helpers.version !== version) {{
+    done("{CB_HELPERS_MISSING}");
+    return;
+}}
+Promise.resolve().then(() => helpers[name](...args)).then(
+    (value) => done({{value: value}}),
+    (error) => done({{error: String(error)}}));
+"""
+
+def cb_js_async(driver: webdriver.Chrome, function: str, *args):
+    """ Same as `cb_js`, but for helpers that return a promise. Waits until
+        the promise settles, up to the script timeout of the driver. """
+    res = driver.execute_async_script(
+        CB_HELPERS_CALL_ASYNC, CB_HELPERS_VERSION, function, list(args))
+    if res == CB_HELPERS_MISSING:
+        res = driver.execute_async_script(
+            CB_HELPERS_JS + CB_HELPERS_CALL_ASYNC,
+            CB_HELPERS_VERSION, function, list(args))
+    if "error" in res:
+        raise selenium_exceptions.JavascriptException(res["error"])
+    return res["value"]
+
+def wait_for_dom(
+        driver: webdriver.Chrome, condition: dict, timeout=10
+        ) -> WebElement | bool:
+    """ Waits in the page until the condition holds and returns right when it
+        does, without polling. See `waitFor` of `CB_HELPERS_JS` for the
+        conditions. Raises a `TimeoutException` after `timeout` seconds.
+    """
+    res = cb_js_async(driver, "waitFor", condition, int(timeout * 1000))
+    if res is None:
+        raise selenium_exceptions.TimeoutException(
+            f"Timed out after {timeout}s waiting for {condition}")
+    return res
+
+def cb_js(driver: webdriver.Chrome, function: str, *args):
+    """ Calls `function` of the resident helper library with `args`, which
+        are passed as script arguments and never need escaping. The library
+        is shipped along with the call only when the page doesn't have it.
+    """
+    res = driver.execute_script(
+        CB_HELPERS_CALL, CB_HELPERS_VERSION, function, list(args))
+    if res == CB_HELPERS_MISSING:
+        res = driver.execute_script(
+            CB_HELPERS_JS + CB_HELPERS_CALL,
+            CB_HELPERS_VERSION, function, list(args))
+    return res
+
+def page_selectors(page: str, proj_name: str | None = None) -> dict[str, str]:
+    """ The selectors of `page`, with the ones of `proj_name` if given. """
+    return {
+        **SELECTORS.get(page, {}),
+        **PROJECT_SELECTORS.get(proj_name, {}).get(page, {})}
+
+def selector(page: str, name: str, proj_name: str | None = None) -> str:
+    """ Looks up a selector of the registry. """
+    try:
+        return page_selectors(page, proj_name)[name]
+    except KeyError:
+        project = f" for the project '{proj_name}'" if proj_name else ""
+        raise SelectorProbeFailed(
+            f"There's no '{name}' selector of the {page} page{project}.")
+
+def probe_page(
+        driver: webdriver.Chrome, page: str, proj_name: str | None = None
+        ) -> None:
+    """ Checks every selector of `page` in a single script call. Raises
+        `SelectorProbeFailed` listing every one that doesn't match.
+    """
+    start = time.perf_counter()
+    selectors = page_selectors(page, proj_name)
+    failed = cb_js(driver, "probe", [
+        [name, css, SELECTOR_MIN_COUNTS.get(name, 1)]
+        for name, css in selectors.items()])
+    if failed:
+        problems = [
+            f"  - {name}: '{css}' is not a valid selector" if found < 0 else
+            f"  - {name}: '{css}' matched {found} of {needed} element(s)"
+            for name, css, found, needed in failed]
+        raise SelectorProbeFailed(
+            f"codeBeamer's markup seems to have changed on the {page} page "\
+            f"😢 ({len(failed)} of {len(selectors)} selectors failed, "\
+            f"probed in {(time.perf_counter() - start) * 1000:.0f} ms). "\
+            "Update SELECTORS for:\n" + "\n".join(problems))
 
 def recursive_search_incl_get_attr(
         driver: webdriver.Chrome, selector: str, text:str,
         node_type: str, attr: str
         ) -> tuple[WebElement, str] | None:
     """ Self explanatory, but you must only use this when the target element has an ID attribute. """
-    rec_search_script = f"""
-    function recSearchTextTC(elem, text, nodeType) {{
-        if ((elem?.nodeName.toLowerCase() === nodeType ) && elem?.textContent.trim().toLowerCase().includes(text.toLowerCase())
-        ) {{
-            return [elem, elem.getAttribute("{attr}")]
-        }}
-        for (let child of elem?.children){{
-            let t_elem = recSearchTextTC(child, text, nodeType)
-            if (t_elem !== null) {{
-                return t_elem
-            }}
-        }}
-        return null
-    }}
-    let elem = document.querySelector("{selector}");
-    return recSearchTextTC(elem, "{text}", "{node_type}");
-    """
-    # TODO
-    return driver.execute_script(rec_search_script)
+    return cb_js(driver, "find", selector, text, node_type, {"attr": attr})
 
 
 def recursive_search_incl_get_attr_excl_class(
@@ -477,27 +1770,9 @@ def recursive_search_incl_get_attr_excl_class(
         text:str, node_type: str, attr: str, excl_class:str
         ) -> tuple[WebElement, str] | None:
     """ Self explanatory, but you must only use this when the target element has an ID attribute. This will skip elements with a class `excl_class` """
-    
-    rec_search_script = f"""
-    function recSearchTextTC(elem, text, nodeType) {{
-        if ((elem?.nodeName.toLowerCase() === nodeType ) 
-        && elem?.textContent.trim().toLowerCase().includes(text.toLowerCase())
-        && ! elem.classList.contains('{excl_class}')
-        ) {{
-            return [elem, elem.getAttribute("{attr}")]
-        }}
-        for (let child of elem?.children){{
-            let t_elem = recSearchTextTC(child, text, nodeType)
-            if (t_elem !== null) {{
-                return t_elem
-            }}
-        }}
-        return null
-    }}
-    let elem = document.querySelector("{selector}");
-    return recSearchTextTC(elem, "{text}", "{node_type}");
-    """
-    return driver.execute_script(rec_search_script)
+    return cb_js(
+        driver, "find", selector, text, node_type,
+        {"attr": attr, "exclClass": excl_class})
 
 def str_to_int(s):
     if s is None:
@@ -508,160 +1783,56 @@ def recursive_search_includes(
         driver: webdriver.Chrome, selector: str,
         text: str, node_type: str
         ) -> WebElement:
-    """ You must use Double quotes to wrap around your selector! """
-
-    rec_search_script = f"""
-    function recSearchText(elem, text, nodeType) {{
-        if (elem.nodeName.toLowerCase() === nodeType && elem.textContent.toLowerCase().includes(text.toLowerCase())) {{
-            return elem;
-        }}
-        for (let child of elem.children){{
-            let t_elem = recSearchText(child, text, nodeType);
-            if (t_elem !== null) {{
-                return t_elem;
-            }}
-        }}
-        return null;
-    }}
-    let elem = document.querySelector("{selector}");
-    return recSearchText(elem, "{text}", "{node_type}");
-    """
-    return driver.execute_script(rec_search_script)
+    """ Returns the first `node_type` element under `selector` whose text includes `text`. """
+    return cb_js(driver, "find", selector, text, node_type)
 
 
 def recursive_search_includes_click_js(
         driver: webdriver.Chrome, selector: str,
         text: str, node_type: str
         ) -> WebElement:
-    """ You must use Double quotes to wrap around your selector! """
-
-    rec_search_script = f"""
-    function recSearchText(elem, text, nodeType) {{
-        if (elem.nodeName.toLowerCase() === nodeType && elem.textContent.toLowerCase().includes(text.toLowerCase())) {{
-            return elem;
-        }}
-        for (let child of elem.children){{
-            let t_elem = recSearchText(child, text, nodeType);
-            if (t_elem !== null) {{
-                return t_elem;
-            }}
-        }}
-        return null;
-    }}
-    let elem = document.querySelector("{selector}");
-    recSearchText(elem, "{text}", "{node_type}").click();
-    """
-    return driver.execute_script(rec_search_script)
+    """ Same as `recursive_search_includes`, but clicks the element in the page. """
+    return cb_js(driver, "find", selector, text, node_type, {"click": True})
 
 
 def recursive_search_exact_set_attr(
         driver: webdriver.Chrome, selector: str, text: str, node_type='option', attr_key='selected', attr_val=''
         ) -> WebElement:
-    """ You must use Double quotes to wrap around your selector! """
-
-    rec_search_script = f"""
-    function recSearchTextExact(elem, text, nodeType) {{
-         if ((elem?.nodeName.toLowerCase() === nodeType ) && (elem?.textContent.trim().toLowerCase() === text.toLowerCase())) {{
-            elem.setAttribute("{attr_key}", "{attr_val}")
-            return elem;
-        }}
-        for (let child of elem.children){{
-            let t_elem = recSearchTextExact(child, text, nodeType);
-            if (t_elem !== null) {{
-                return t_elem;
-            }}
-        }}
-        return null;
-    }}
-    let elem = document.querySelector("{selector}");
-    return recSearchTextExact(elem, "{text}", "{node_type}");
-    """
-    return driver.execute_script(rec_search_script)
-
+    """ Sets the attribute of the element whose text is exactly `text`. """
+    return cb_js(
+        driver, "find", selector, text, node_type,
+        {"exact": True, "setAttr": [attr_key, attr_val]})
 
 
 def recursive_search_exact(
         driver: webdriver.Chrome, selector: str,
         text: str, node_type: str
         ) -> WebElement:
-    """ You must use Double quotes to wrap around your selector! """
-
-    rec_search_script = f"""
-    function recSearchTextExact(elem, text, nodeType) {{
-         if ((elem?.nodeName.toLowerCase() === nodeType ) && (elem?.textContent.trim().toLowerCase() === text.toLowerCase())) {{
-            return elem;
-        }}
-        for (let child of elem.children){{
-            let t_elem = recSearchTextExact(child, text, nodeType);
-            if (t_elem !== null) {{
-                return t_elem;
-            }}
-        }}
-        return null;
-    }}
-    let elem = document.querySelector("{selector}");
-    return recSearchTextExact(elem, "{text}", "{node_type}");
-    """
-    return driver.execute_script(rec_search_script)
-
+    """ Returns the first `node_type` element under `selector` whose text is exactly `text`. """
+    return cb_js(driver, "find", selector, text, node_type, {"exact": True})
 
 
 def select_filter(
         driver: webdriver.Chrome, text: str, node_type: str
         ) -> WebElement:
-    """ You must use Double quotes to wrap around your selector. You can use this to add as many as filters as you want. The follow up selection needs to have to be customized, however. """
-
-    rec_search_script = f"""
-    function recSearchTextExact(elem, text, nodeType) {{
-         if ((elem?.nodeName.toLowerCase() === nodeType ) && (elem?.textContent.trim().toLowerCase() === text.toLowerCase())) {{
-            return elem;
-        }}
-        for (let child of elem.children){{
-            let t_elem = recSearchTextExact(child, text, nodeType);
-            if (t_elem !== null) {{
-                return t_elem;
-            }}
-        }}
-        return null;
-    }}
-    let elem = document.querySelectorAll('.ui-widget-header.ui-corner-all.ui-multiselect-header.ui-helper-clearfix.ui-multiselect-hasfilter + ul')[3];
-    recSearchTextExact(elem, "{text}", "{node_type}").click();
-    """
-    return driver.execute_script(rec_search_script)
+    """ You can use this to add as many as filters as you want. The follow up selection needs to have to be customized, however. """
+    return cb_js(
+        driver, "find", selector("filter", "filter_menu"),
+        text, node_type, {"exact": True, "click": True, "nth": FILTER_MENU_NTH})
 
 
 def select_status(
         driver: webdriver.Chrome, text: str, 
         node_type: str, toggle_not: bool
         ) -> WebElement:
-    """ You must use Double quotes to wrap around your selector! """
-
-    rec_search_script = f"""
-    function recSearchTextExact(elem, text, nodeType) {{
-         if ((elem?.nodeName.toLowerCase() === nodeType ) && (elem?.textContent.trim().toLowerCase() === text.toLowerCase())) {{
-            return elem;
-        }}
-        for (let child of elem.children){{
-            let t_elem = recSearchTextExact(child, text, nodeType);
-            if (t_elem !== null) {{
-                return t_elem;
-            }}
-        }}
-        return null;
-    }}
-    let elem = document.querySelector('div[class="ui-multiselect-menu ui-widget ui-widget-content ui-corner-all queryConditionSelector statusSelector"]');
-    let target = recSearchTextExact(elem, "{text}", "{node_type}")
-    
-    """
+    """ Selects the status filter. `toggle_not` negates the filter first. """
+    probe_page(driver, "status_filter")
+    opts = {"exact": True, "click": True}
     if toggle_not:
-        rec_search_script += """
-        elem.querySelector('.notBadge').click()
-        """
-    # Make final submission
-    rec_search_script += """
-    target.click()
-    """
-    return driver.execute_script(rec_search_script)
+        opts["toggle"] = ".notBadge"
+    return cb_js(
+        driver, "find", selector("status_filter", "status_menu"),
+        text, node_type, opts)
 
 def areAllFoldersOpen(driver: webdriver.Chrome): 
     script = """
@@ -751,40 +1922,34 @@ def expandAllFolders(driver: webdriver.Chrome):
     driver.execute_script(script)
         
 
+def expand_tree(
+        driver: webdriver.Chrome, plan: RunPlan, timeout=250, step_timeout=30
+        ) -> list[str]:
+    """ Opens the folders of the test case tree leading to the test cases of
+        the plan, and returns as soon as the last one has loaded. Returns the
+        ids that are still not on the tree.
+    """
+    print("Expanding the folders... This may take a moment ⌛")
+    targets = {r.id: r.name for r in plan}
+    driver.set_script_timeout(timeout)
+    try:
+        return cb_js_async(
+            driver, "openTreeFor", "#treePane",
+            [[id, name] for id, name in targets.items()],
+            int(step_timeout * 1000))
+    finally:
+        driver.set_script_timeout(SCRIPT_TIMEOUT)
+
 def select_location(
         driver: webdriver.Chrome, text: str,
         node_type: str, proj_name: str
         ) -> WebElement:
-    """ This must be used after using `select_filter()` method and choosing `test location`. This is hacky, but this uses custom selectors based on the project. 
-
-    You must use Double quotes to wrap around your selector!
+    """ This must be used after using `select_filter()` method and choosing `test location`. This is hacky, but this uses custom selectors based on the project, see PROJECT_SELECTORS. 
     """
-    if proj_name == 'mib3oigp':
-        last_selector = '73303386choiceList11Selector'
-    elif proj_name == 'nar classic':
-        last_selector = '94014605choiceList11Selector'
-    try:
-        rec_search_script = f"""
-        function recSearchTextExact(elem, text, nodeType) {{
-            if ((elem?.nodeName.toLowerCase() === nodeType ) && (elem?.textContent.trim().toLowerCase() === text.toLowerCase())) {{
-                return elem;
-            }}
-            for (let child of elem.children){{
-                let t_elem = recSearchTextExact(child, text, nodeType);
-                if (t_elem !== null) {{
-                    return t_elem;
-                }}
-            }}
-            return null;
-        }}
-        let elem = document.querySelector('div[class="ui-multiselect-menu ui-widget ui-widget-content ui-corner-all queryConditionSelector {last_selector}"]');
-        recSearchTextExact(elem, "{text}", "{node_type}").click();
-        """
-        return driver.execute_script(rec_search_script)
-    except selenium_exceptions.JavascriptException as e:
-        print(print(f"The selector for the location filter may have changed. {e}"))
-        if DEBUG:
-            time.sleep(10000)
+    probe_page(driver, "location_filter", proj_name)
+    return cb_js(
+        driver, "find", selector("location_filter", "location_menu", proj_name),
+        text, node_type, {"exact": True, "click": True})
 
 def table_search_set_attr(
         driver: webdriver.Chrome, table_selector="#historyList", node_type="tr", text="", attempts=3, 
@@ -799,38 +1964,9 @@ def table_search_set_attr(
     """
     for _ in range(attempts):
         try:
-            check_search_res = f"""
-    function get_index_tr(test_case_name, css_selector, nodeType, attr, attr_v) {{
-        function recSearchTextAttr(elem, text, nodeType) {{
-            if (elem?.nodeName.toLowerCase() === nodeType && elem?.textContent.trim().toLowerCase().includes(text.toLowerCase())) {{
-                elem.setAttribute(attr, attr_v)
-                return elem;
-            }}
-            for (let child of elem.children) {{
-                let t_elem = recSearchTextAttr(child, text, nodeType);
-                if (t_elem !== null) {{
-                    return t_elem;
-                }}
-            }}
-            return null;
-        }}
-        let x = document.querySelectorAll(`${{css_selector}} tbody > tr`);
-        let i = 0;
-        for (let e of x) {{
-            let elem = recSearchTextAttr(e, test_case_name, nodeType);
-            if (!e.style.display.toLowerCase().includes("none") && elem) {{
-                while (!x[i].querySelector('input').checked) {{
-                    x[i].querySelector('input').click();
-                }}
-                return [i, elem];
-            }}
-            i += 1;
-        }}
-        return -1;
-    }}
-    return get_index_tr('{text}', '{table_selector}', '{node_type}' ,'{attr_key}', '{attr_val}');
-            """
-            return driver.execute_script(check_search_res)
+            opts = {"setAttr": [attr_key, attr_val]} if attr_key else {}
+            return cb_js(
+                driver, "tableSearch", table_selector, text, node_type, opts)
         except selenium_exceptions.StaleElementReferenceException as e:
             print("Element became stale 🍿. Trying again.")
             time.sleep(0.2)
@@ -851,37 +1987,9 @@ def table_search(
     print(f"Searching for entry '{test_set_name}' in the table... ")
     for _ in range(attempts):
         try:
-            check_search_res = f"""
-    function get_index_tr(test_case_name, css_selector, attr) {{
-        function recSearchTextAttr(elem, text, nodeType) {{
-            if (elem.nodeName.toLowerCase() === nodeType && elem.textContent.trim().toLowerCase().includes(text.toLowerCase())) {{
-                return [elem, elem.getAttribute(attr)];
-            }}
-            for (let child of elem.children) {{
-                let t_elem = recSearchTextAttr(child, text, nodeType);
-                if (t_elem !== null) {{
-                    return t_elem;
-                }}
-            }}
-            return null;
-        }}
-        let x = document.querySelectorAll(`${{css_selector}} tbody > tr`);
-        let i = 0;
-        for (let e of x) {{
-            let tup = recSearchTextAttr(e, test_case_name, "a");
-            if (!e.style.display.toLowerCase().includes("none") && tup) {{
-                while (!x[i].querySelector('input').checked) {{
-                    x[i].querySelector('input').click();
-                }}
-                return [i, tup[0], tup[1]];
-            }}
-            i += 1;
-        }}
-        return -1;
-    }}
-    return get_index_tr('{test_set_name}', '{table_selector}', '{attr}');
-            """
-            return driver.execute_script(check_search_res)
+            return cb_js(
+                driver, "tableSearch", table_selector, test_set_name, "a",
+                {"attr": attr})
         except selenium_exceptions.StaleElementReferenceException as e:
             print("Element became stale 🍿. Trying again.")
             time.sleep(0.2)
@@ -924,20 +2032,37 @@ def set_attribute(
         f"document.querySelector('{selector}').setAttribute('{attr_key}', '{attr_val}')")
     return
 
+def set_text(
+        driver: webdriver.Chrome, elem: WebElement, text: str,
+        keystrokes=False) -> None:
+    """ Replaces the text of the input or textarea in one script call, firing
+        the input, keyup and change events codeBeamer listens for. Types it
+        key by key instead with `keystrokes`, for fields that need real key
+        presses, or if `elem` isn't a text field.
+    """
+    if keystrokes or not cb_js(driver, "setText", elem, text):
+        elem.send_keys(Keys.CONTROL + "a")
+        elem.send_keys(Keys.DELETE)
+        elem.send_keys(text)
+
     
-def wait_till_loading_fin(wait:WebDriverWait):
-    """ Waits for the loading popup to be dismissed. """
-    try:
-        wait.until(EC.visibility_of_element_located(
-            (By.CSS_SELECTOR, ".ui-widget-overlay.ui-front"))
-        )
-        wait.until(
-            EC.invisibility_of_element_located(
-                (By.CSS_SELECTOR, ".ui-widget-overlay.ui-front")
-            )
-        )   
-    except selenium_exceptions.TimeoutException as e:
-        print("Loading banner not shown -- continuing normally...")
+def wait_till_loading_fin(
+        driver: webdriver.Chrome, idle_ms=NETWORK_IDLE_MS, timeout=20
+        ) -> None:
+    """ Waits until codeBeamer has no AJAX request in flight for `idle_ms`.
+        Returns right away when nothing is loading.
+    """
+    idle = cb_js_async(driver, "networkIdle", idle_ms, int(timeout * 1000))
+    if idle is None:
+        # The page isn't tracked, so fall back to the loading popup
+        try:
+            wait_for_dom(driver, {
+                "selector": ".ui-widget-overlay.ui-front", "gone": True},
+                timeout)
+        except selenium_exceptions.TimeoutException as e:
+            print("Loading popup still shown -- continuing normally...")
+    elif not idle:
+        print(f"Still loading after {timeout}s -- continuing normally...")
 
 def click_on(locator:tuple, driver, timeout=3):
     wait = WebDriverWait(driver, timeout)
@@ -951,84 +2076,81 @@ def click_on(locator:tuple, driver, timeout=3):
             print("Element became stale 🍿. Trying again.")
             pass 
 
-def click_on_highlighted(driver: webdriver.Chrome):
+def click_on_highlighted(driver: webdriver.Chrome, tries=3):
     """ Clicks the TC and verifies that the item is clicked. """
-    while True:
+    for _ in range(tries):
         try:
             # Ensure that the entry is clicked.
             click_on(
                 (By.CSS_SELECTOR, ".jstree-anchor.jstree-search"), 
                 driver, 3)
            
-            if "jstree-clicked" in driver.find_element(
-                    By.CSS_SELECTOR, ".jstree-anchor.jstree-search"
-                ).get_attribute("class"):
-                break
-        except selenium_exceptions.StaleElementReferenceException as e:
-            print("Stale, but trying again.")
-            time.sleep(0.2)
-            continue
+            wait_for_dom(driver, {
+                "selector": ".jstree-anchor.jstree-search",
+                "hasClass": "jstree-clicked"}, 2)
+            return
+        except (selenium_exceptions.StaleElementReferenceException,
+                selenium_exceptions.TimeoutException) as e:
+            print("The TC isn't highlighted yet, but trying again.")
+    raise selenium_exceptions.TimeoutException("Couldn't click on the highlighted TC 😢")
         
 def context_click_testcase(
         driver: webdriver.Chrome,  test_case_name:str,
         attempts:int, timeout=3
         ) -> None:
-    wait = WebDriverWait(driver,timeout)
     action_chains = AC.ActionChains(driver)
     for _ in range(attempts):
         try:
             action_chains.context_click(recursive_search_includes(driver,'#treePane',test_case_name,"a" )).perform()
-            wait.until(
-                EC.visibility_of_any_elements_located(
-                    (By.CSS_SELECTOR, "ul[class='vakata-context jstree-contextmenu jstree-default-contextmenu']")
-                )
-            )
+            wait_for_dom(driver, {
+                "selector": "ul[class='vakata-context jstree-contextmenu jstree-default-contextmenu']",
+                "visible": True}, timeout)
             break
         except selenium_exceptions.TimeoutException as e:
+            action_chains.reset_actions()
             print("Couldn't right-click 😢. Trying again...")
-            time.sleep(0.5)
-            pass
         
         
 def select_from_context_menu(
         driver: webdriver.Chrome, target_text_content: str, timeout=10) -> None:
-    """ You must use Double quotes to wrap around your selector! """
-    while True:
+    """ Clicks the option of the tree's context menu as soon as it shows. """
+    for _ in range(3):
         try:
-            recursive_search_includes(
-                driver,
-                "ul[class='vakata-context jstree-contextmenu "\
-                "jstree-default-contextmenu']", target_text_content, "a" 
+            wait_for_dom(driver, {
+                "selector": "ul[class='vakata-context jstree-contextmenu "\
+                            "jstree-default-contextmenu']",
+                "visible": True,
+                "text": target_text_content, "nodeType": "a"}, timeout
             ).click()
-            break
+            return
         except selenium_exceptions.StaleElementReferenceException as e:
             print("Stale element. Trying again.")
-            time.sleep(0.5)
-            continue
-        except AttributeError:
-            print("Doesn't seem to detect context menu options... Trying again")
-            time.sleep(0.5)
         except selenium_exceptions.TimeoutException as e:
             print("I couldn't open up the context menu 😢. "\
                   "Try not to move the mouse around.")
-            raise selenium_exceptions.TimeoutException
+            raise
+    raise selenium_exceptions.TimeoutException(
+        f"Couldn't select '{target_text_content}' from the context menu.")
             
 
 def select_from_dropdown_menu(
         driver: webdriver.Chrome, selector:str,
-        target_text_content: str, elem_tag = "option" ):
-    """ You must use Double quotes to wrap around your selector! 
+        target_text_content: str, elem_tag = "option", timeout=10):
+    """ Selects the option as soon as it shows up in the dropdown menu.
         Customized on a project basis.
     
     """
-
-    while True:
+    for _ in range(3):
         try:
-            recursive_search_includes(driver, selector, target_text_content, elem_tag).click()
-            break
+            wait_for_dom(driver, {
+                "selector": selector,
+                "text": target_text_content, "nodeType": elem_tag}, timeout
+            ).click()
+            return
         except selenium_exceptions.StaleElementReferenceException as e:
             print("Stale element. Trying again.")
-            continue
+    raise selenium_exceptions.TimeoutException(
+        f"Couldn't select '{target_text_content}' from '{selector}'.")
 
 def handle_child_tc_warning(driver: webdriver.Chrome, parent_css_selector="div.ui-dialog-buttonset") -> bool:
     """ Looks for the warning, then switches to the iframe. """
@@ -1078,9 +2200,73 @@ def expand_all_folders(driver:webdriver.Chrome):
 		recursiveOpen(document.querySelector('ul[role="group"]'), 0)
     """
 
-def create_test_set(driver: webdriver.Chrome, df: pd.DataFrame, component_name:str, res_col_name:str) -> str:
-    """ Creates a test set based on everything on the existing 'name' column
-        on the spreadsheet.  
+def select_test_cases_bulk(
+        driver: webdriver.Chrome, tc_ids: list[str]
+        ) -> tuple[list[str], list[str]]:
+    """ Selects all the test cases on the tree in a single script call
+        through the jstree API. Returns a tuple of the following:
+        0: The ids that are selected
+        1: The ids that are not on the tree
+    """
+    return cb_js(driver, "selectTreeNodes", "#treePane", list(dict.fromkeys(tc_ids)))
+
+def select_test_cases(driver: webdriver.Chrome, plan: RunPlan) -> str:
+    """ Selects the test cases on the tree one by one with ctrl + click.
+        Returns the name of the last test case selected, if any.
+    """
+    short_wait = WebDriverWait(driver, 2)
+    action_chains = AC.ActionChains(driver)
+
+    def tc_is_selected(driver: webdriver.Chrome, elem:WebElement ):
+        if not elem:
+            raise AttributeError
+        return "jstree-clicked" in elem.get_attribute('class')
+    i = 0
+
+    # To 
+    last_successful_tc = ''
+    for record in plan:
+        for tries in range(2, -1, -1):
+            try:
+                # Switch to default iframe
+                driver.switch_to.default_content()
+                
+                tc_elem = driver.find_element(By.CSS_SELECTOR, f"""li[id="{record.id}"] > a""")
+
+                # Only click the first item, then hold ctrl thereafter
+                if i == 0:
+                    action_chains.click(tc_elem).perform()
+                else:
+                    action_chains.key_down(Keys.CONTROL).click(tc_elem).key_up(Keys.CONTROL).perform()
+
+                short_wait.until(lambda d: tc_is_selected(d, tc_elem))
+                last_successful_tc = record.name
+                break
+            except selenium_exceptions.TimeoutException as e:
+                action_chains.reset_actions()
+                print(f"Timed out for this test case: {record.name}. "\
+                      "Trying {tries} more times...")
+                pass
+            except selenium_exceptions.NoSuchElementException as e:
+                action_chains.reset_actions()
+                print(f"I could not find the test case: {record.name} 😢")
+                break
+        i += 1
+    return last_successful_tc
+
+def get_test_set_name(component_name: str, res_col_name: str) -> str:
+    """ Name of the test set, `[<component>][<version>] Test Set | <desc>`. """
+    ver_number = res_col_name[:7].upper()
+    t_desc = res_col_name[7:].strip().title()
+    ver_desc = f" | {t_desc}" if len(t_desc) > 1 else ''
+    return f"[{component_name.upper()}][{ver_number}] Test Set{ver_desc}"
+
+def create_test_set(
+        driver: webdriver.Chrome, plan: RunPlan, component_name:str,
+        res_col_name:str, bulk=True) -> str:
+    """ Creates a test set based on every test case of the run plan.  
+        With `bulk`, the test cases are selected all at once through the
+        tree's API. Otherwise, or if that fails, they are clicked one by one.
         `Component_name` and `res_col_name` is needed for naming purposes.
         the `res_col_name` variable should be formatted in the format:
         *  "`<version> <priorities, if any>`"
@@ -1090,21 +2276,18 @@ def create_test_set(driver: webdriver.Chrome, df: pd.DataFrame, component_name:s
         print("Creation of a test set has started. Please do not move your mouse during the process! ✋")
     # If the test set already exists, use that one.
     wait = WebDriverWait(driver, 20)
-    short_wait = WebDriverWait(driver, 2)
     action_chains = AC.ActionChains(driver)
     
     # Use this test set name to search and add.
-    ver_number = res_col_name[:7].upper()
-    t_desc = res_col_name[7:].strip().title()
-    ver_desc = f" | {t_desc}" if len(t_desc) > 1 else ''
-    test_set_name = f"[{component_name.upper()}][{ver_number}] Test Set{ver_desc}"
+    test_set_name = get_test_set_name(component_name, res_col_name)
      
-    wait.until(EC.visibility_of_element_located((By.ID, "searchBox_treePane")))
-    wait.until(EC.visibility_of_element_located((By.ID, "go_treePane")))
+    wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, selector("tree", "tree_search"))))
+    wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, selector("tree", "tree_go"))))
     wait.until(EC.visibility_of_element_located(
         (By.CSS_SELECTOR, ".ui-dialog-content")))
     wait.until(EC.invisibility_of_element_located(
         (By.CSS_SELECTOR, ".ui-dialog-content")))
+    probe_page(driver, "tree")
    
     # Remove any existing filters, if any
     try:
@@ -1118,7 +2301,8 @@ def create_test_set(driver: webdriver.Chrome, df: pd.DataFrame, component_name:s
 
     # Apply 2 filters
     # Open filter window
-    click_on((By.CSS_SELECTOR, 'span.filterLabel'), driver, 20)
+    click_on((By.CSS_SELECTOR, selector("tree", "filter_label")), driver, 20)
+    probe_page(driver, "filter")
     
     # Choose test location
     # Window 1
@@ -1126,7 +2310,7 @@ def create_test_set(driver: webdriver.Chrome, df: pd.DataFrame, component_name:s
     select_location(driver, 'NAR', 'span', proj_name)
 
     # Open filter window
-    click_on((By.CSS_SELECTOR, 'span.filterLabel'), driver, 20)
+    click_on((By.CSS_SELECTOR, selector("tree", "filter_label")), driver, 20)
     
     wait.until(EC.presence_of_element_located(
         (By.CSS_SELECTOR, 
@@ -1136,52 +2320,40 @@ def create_test_set(driver: webdriver.Chrome, df: pd.DataFrame, component_name:s
     select_status(driver, "deprecated", "span", True)
 
     # Click GO to apply the filter
-    click_on((By.CSS_SELECTOR, "#actionBarSearchButton"), driver, 3)
+    click_on((By.CSS_SELECTOR, selector("tree", "search_button")), driver, 3)
 
     # Wait until loading is finished
-    wait_till_loading_fin(wait)     
+    wait_till_loading_fin(driver)     
    
-    # Expand all folder
-    expandAllFolders(driver)
-    
-    # Wait until the folders are open
-    WebDriverWait(driver,250,1).until(lambda d: areAllFoldersOpen(d))
-
-    def tc_is_selected(driver: webdriver.Chrome, elem:WebElement ):
-        if not elem:
-            raise AttributeError
-        return "jstree-clicked" in elem.get_attribute('class')
-    i = 0
+    # Expand the folders until all the test cases are loaded
+    try:
+        expand_tree(driver, plan)
+    except (selenium_exceptions.JavascriptException,
+            selenium_exceptions.TimeoutException) as e:
+        print("Couldn't expand only the needed folders. Expanding all of them...")
+        expandAllFolders(driver)
+        
+        # Wait until the folders are open
+        WebDriverWait(driver,250,1).until(lambda d: areAllFoldersOpen(d))
 
-    # To 
+    # Select every test case of the plan
+    driver.switch_to.default_content()
     last_successful_tc = ''
-    for df_row in df.iterrows():
-        for tries in range(2, -1, -1):
-            try:
-                # Switch to default iframe
-                driver.switch_to.default_content()
-                
-                tc_elem = driver.find_element(By.CSS_SELECTOR, f"""li[id="{df_row[1]['id']}"] > a""")
-
-                # Only click the first item, then hold ctrl thereafter
-                if i == 0:
-                    action_chains.click(tc_elem).perform()
-                else:
-                    action_chains.key_down(Keys.CONTROL).click(tc_elem).key_up(Keys.CONTROL).perform()
+    if bulk:
+        try:
+            selected, missing = select_test_cases_bulk(driver, [r.id for r in plan])
+            for tc_id in missing:
+                print(f"I could not find the test case: {plan.find(tc_id).name} 😢")
+            print(f"Selected {len(selected)} test cases.")
+            if selected:
+                last_successful_tc = plan.find(selected[-1]).name
+        except selenium_exceptions.JavascriptException as e:
+            print("Couldn't select the test cases all at once. "\
+                  "Selecting them one by one instead...")
+            bulk = False
+    if not bulk:
+        last_successful_tc = select_test_cases(driver, plan)
 
-                short_wait.until(lambda d: tc_is_selected(d, tc_elem))
-                last_successful_tc = df_row[1]['name']
-                break
-            except selenium_exceptions.TimeoutException as e:
-                action_chains.reset_actions()
-                print(f"Timed out for this test case: {df_row[1]['name']}. "\
-                      "Trying {tries} more times...")
-                pass
-            except selenium_exceptions.NoSuchElementException as e:
-                action_chains.reset_actions()
-                print(f"I could not find the test case: {df_row[1]['name']} 😢")
-                break
-        i += 1
     # At the final test case, right click, if possible.
     if last_successful_tc:
         context_click_testcase(driver, last_successful_tc, 3)
@@ -1208,7 +2380,7 @@ def create_test_set(driver: webdriver.Chrome, df: pd.DataFrame, component_name:s
         driver.execute_script(
             """document.querySelector("#filterInput").removeAttribute('maxLength')""")
         click_on((By.CSS_SELECTOR, "#filterInput"), driver, 3)
-        driver.find_element(By.CSS_SELECTOR, "#filterInput").send_keys(test_set_name)
+        set_text(driver, driver.find_element(By.CSS_SELECTOR, "#filterInput"), test_set_name)
 
         idx = table_search(driver, test_set_name=test_set_name)
     except selenium_exceptions.TimeoutException as e:
@@ -1216,15 +2388,23 @@ def create_test_set(driver: webdriver.Chrome, df: pd.DataFrame, component_name:s
         click_on((By.CSS_SELECTOR, "#searchTab-tab"), driver, 3 )
         
         # type in search pattern
-        driver.find_element(By.CSS_SELECTOR, '#searchPattern').send_keys(test_set_name)
+        set_text(driver, driver.find_element(By.CSS_SELECTOR, '#searchPattern'), test_set_name)
+
+        # Rows of an earlier search, which the results replace
+        old_rows = driver.find_elements(By.CSS_SELECTOR, "#searchList tbody > tr")
 
         # Press search
         click_on((By.CSS_SELECTOR, '#searchButton'), driver, 3)
 
         # Wait until results show
-        time.sleep(2)
+        try:
+            if old_rows:
+                WebDriverWait(driver, 5).until(EC.staleness_of(old_rows[0]))
+            wait_for_dom(driver, {"selector": "#searchList tbody > tr"}, 5)
+        except selenium_exceptions.TimeoutException as e:
+            print("No search results are shown.")
 
-        idx = table_search(driver, "#searchList", test_set_name)[0]
+        idx = table_search(driver, "#searchList", test_set_name)
 
 
     # The test set is not found
@@ -1267,9 +2447,9 @@ def create_test_set(driver: webdriver.Chrome, df: pd.DataFrame, component_name:s
 
         click_on((By.CSS_SELECTOR, 'input[name="createNewTestSet"]'),driver, 3)
 
-        wait.until(
+        set_text(driver, wait.until(
             EC.visibility_of_element_located((By.CSS_SELECTOR, "#summary"))
-            ).send_keys(test_set_name)
+            ), test_set_name)
 
         click_on((By.CSS_SELECTOR, 'input[name="SUBMIT"]'), driver, 3)
 
@@ -1305,90 +2485,680 @@ def create_test_set(driver: webdriver.Chrome, df: pd.DataFrame, component_name:s
     return "http://vwavncb.lge.com:8080" + href_link[1]
 
 
-
-def url_extractor(s: str):
-    """ Extracts codeBeamer links from a plain text """
-    start = s.find('http://')
-    urls = []
-    while start >= 0 :
-        end = s.find('\n', start)
-        if end == -1: end = s.find(' ', start)
-        if end == -1: 
-            end = find_nth(s, '/', 5, start) + 1 # Get 1 after the slash
-            if end != -1 and end+8 <= len(s) and s[end:end+8].isnumeric():
-                # Not a valid CB url.
-                end = end+8
-            else:
-                end = -1
-        if end != -1:
-            r_url = s[start:end].split('\n')[0].strip()
-            urls.append(r_url)
-            start = s.find('http://', start + len(r_url))
+class CodeBeamerClient:
+    """ Client of codeBeamer's REST API. The connections are pooled and kept
+        alive, so the calls after the first skip the TCP handshake.
+        Authenticates with `cookies` of a session, if given, instead of the
+        user and the password.
+    """
+    def __init__(
+            self, base_url: str, user="", password="",
+            maxsize=RESULT_WORKERS, timeout=30, cookies: dict | None = None,
+            retries=3):
+        self.base_url = base_url.rstrip('/')
+        if cookies:
+            auth = {"Cookie": "; ".join(f"{k}={v}" for k, v in cookies.items())}
         else:
-            start = s.find(' ', start)
-    return urls
-       
-def find_nth(haystack:str, needle: str, n: int, offset = 0) -> int:
-    """ Who knew a LC problem would come in handy? """
-    start = haystack.find(needle, offset)
-    while start >= 0 and n > 1:
-        start = haystack.find(needle, start + len(needle))
-        n -= 1
-    return start
+            auth = urllib3.make_headers(basic_auth=f"{user}:{password}")
+        self.http = urllib3.PoolManager(
+            maxsize=maxsize, block=True,
+            headers={
+                **auth,
+                **urllib3.make_headers(keep_alive=True),
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+            },
+            timeout=urllib3.Timeout(total=timeout),
+            retries=urllib3.Retry(
+                total=retries, backoff_factor=0.3,
+                status_forcelist=(502, 503, 504)))
+
+    def request(self, method: str, path: str, body=None, fields=None):
+        """ Calls the API at `path` with `body` as JSON, or `fields` as the
+            query string. Returns the decoded JSON response.
+        """
+        res = self.http.request(
+            method, self.base_url + CB_API_PATH + path, fields=fields,
+            body=None if body is None else json.dumps(body))
+        if res.status >= 400:
+            raise CodeBeamerApiError(
+                f"{method} {path} failed with {res.status}: "\
+                f"{res.data.decode(errors='replace')[:200]}")
+        return json.loads(res.data) if res.data else None
+
+    def get_page(self, link: str) -> str:
+        """ Returns the HTML of the page at `link`, a URL or a path. """
+        if link.startswith("/"):
+            link = self.base_url + link
+        res = self.http.request("GET", link, headers={
+            **self.http.headers, "Accept": "text/html"})
+        if res.status >= 400:
+            raise CodeBeamerApiError(f"GET {link} failed with {res.status}")
+        return res.data.decode(errors="replace")
+
+def browser_client(driver: webdriver.Chrome) -> CodeBeamerClient:
+    """ Client sharing the logged in session of the browser, for reading
+        pages without rendering them.
+    """
+    link = urlsplit(driver.current_url)
+    return CodeBeamerClient(
+        f"{link.scheme}://{link.netloc}",
+        cookies={c["name"]: c["value"] for c in driver.get_cookies()})
+
+class HtmlScraper(HTMLParser):
+    """ Collects the attributes and the text of the elements matching the
+        `rules`, by rule name. A rule is called with the tag, the attributes
+        and the (tag, attributes) of the enclosing elements.
+    """
+    VOID_TAGS = {
+        "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+        "meta", "source", "track", "wbr"}
+
+    def __init__(self, rules: dict):
+        super().__init__(convert_charrefs=True)
+        self.rules = rules
+        self.found: dict[str, list[dict]] = {name: [] for name in rules}
+        # [tag, attributes, entries collecting the text] of the open elements
+        self.stack = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {k: v or "" for k, v in attrs}
+        collecting = []
+        for name, rule in self.rules.items():
+            if rule(tag, attrs, self.stack):
+                entry = {"attrs": attrs, "text": []}
+                self.found[name].append(entry)
+                collecting.append(entry)
+        if tag not in self.VOID_TAGS:
+            self.stack.append((tag, attrs, collecting))
+
+    def handle_endtag(self, tag):
+        # Closes the unclosed elements in between too
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i][0] == tag:
+                del self.stack[i:]
+                return
+
+    def handle_data(self, data):
+        for _, _, collecting in self.stack:
+            for entry in collecting:
+                entry["text"].append(data)
+
+def scrape(html: str, rules: dict) -> dict[str, list[tuple[dict, str]]]:
+    """ (attributes, text) of the elements of `html` matching each rule. """
+    scraper = HtmlScraper(rules)
+    scraper.feed(html)
+    scraper.close()
+    return {
+        name: [(e["attrs"], " ".join("".join(e["text"]).split())) for e in entries]
+        for name, entries in scraper.found.items()}
+
+def has_class(attrs: dict, cls: str) -> bool:
+    return cls in attrs.get("class", "").split()
+
+def within_id(stack: list, id: str) -> bool:
+    return any(attrs.get("id") == id for _, attrs, _ in stack)
+
+def test_set_count(text: str) -> int | None:
+    """ The number in the "Test Cases & Sets (N)" tab, or None. """
+    match = re.search(r"Test Cases & Sets \((\d+)\)", text)
+    return int(match[1]) if match else None
+
+def fetch_test_set_page(client: CodeBeamerClient, link: str) -> dict | None:
+    """ Reads what `verify_if_correct_test_case` and `get_test_set_tc_ids`
+        need from the test set page. Returns None if the page doesn't show
+        it, e.g. when the session has expired.
+    """
+    try:
+        found = scrape(client.get_page(link), {
+            "count": lambda tag, attrs, stack:
+                attrs.get("id") == "testSetTestCases-tab",
+            "summary": lambda tag, attrs, stack:
+                tag == "a" and has_class(attrs, "generated-link")
+                and bool(stack) and has_class(stack[-1][1], "breadcrumbs-summary"),
+            "tc_links": lambda tag, attrs, stack:
+                tag == "a" and "href" in attrs
+                and within_id(stack, "testSetTestCases"),
+        })
+    except (CodeBeamerApiError, urllib3.exceptions.HTTPError) as e:
+        print(f"Couldn't read the test set page without the browser: {e}")
+        return None
+    if not found["count"] or not found["summary"]:
+        return None
+    count = test_set_count(found["count"][0][1])
+    if count is None:
+        return None
+
+    tc_ids = []
+    for attrs, _ in found["tc_links"]:
+        match = re.search(r"/cb/(?:item|issue)/(\d+)", attrs["href"])
+        if match:
+            tc_ids.append(match[1])
+    tc_ids = list(dict.fromkeys(tc_ids))
+    # e.g. the table is paged or loaded later by the page's scripts
+    if len(tc_ids) != count:
+        return None
+    return {
+        "count": count,
+        "summary": found["summary"][0][1],
+        "tc_ids": tc_ids,
+    }
+
+def find_test_set_link(
+        client: CodeBeamerClient, tracker_link: str, test_set_name: str
+        ) -> str | None:
+    """ Looks for the test set on the tracker's table like `table_search`
+        does, without the browser. Returns the link to it, if listed.
+    """
+    try:
+        found = scrape(client.get_page(tracker_link), {
+            "items": lambda tag, attrs, stack:
+                tag == "a" and "data-id" in attrs and "href" in attrs
+                and within_id(stack, "trackerItems"),
+        })
+    except (CodeBeamerApiError, urllib3.exceptions.HTTPError) as e:
+        print(f"Couldn't read the tracker without the browser: {e}")
+        return None
+    for attrs, text in found["items"]:
+        if test_set_name.lower() in text.lower():
+            href = attrs["href"]
+            return client.base_url + href if href.startswith("/") else href
+    return None
+
+def cb_client(proj_name: str, component_name: str, **options) -> CodeBeamerClient:
+    """ Client for the codeBeamer server of the component's links. The
+        `options` are passed on to `CodeBeamerClient`.
+    """
+    link = urlsplit(
+        CONFIG["settings"][proj_name]["components"][component_name]\
+        ["test_case_link"])
+    return CodeBeamerClient(
+        f"{link.scheme}://{link.netloc}", CB_ID, CB_PASS, **options)
+
+def cb_query(client: CodeBeamerClient, query: str, page_size=CB_API_BATCH_SIZE) -> list[dict]:
+    """ Every item matching the cbQL `query`, page by page. """
+    items = []
+    page = 1
+    while True:
+        res = client.request("GET", "/items/query", fields={
+            "queryString": query, "page": page, "pageSize": page_size})
+        items.extend(res["items"])
+        if len(items) >= res["total"] or not res["items"]:
+            return items
+        page += 1
+
+def find_test_set_item(
+        client: CodeBeamerClient, tracker_id: str, test_set_name: str
+        ) -> dict | None:
+    """ Returns the test set named exactly `test_set_name`, if any. """
+    name = test_set_name.replace("\\", "\\\\").replace("'", "\\'")
+    for item in cb_query(
+            client, f"tracker.id IN ({tracker_id}) AND summary = '{name}'"):
+        if item["name"] == test_set_name:
+            return item
+    return None
+
+def get_active_test_cases(
+        client: CodeBeamerClient, tc_ids: list[str]) -> tuple[list[int], list[str]]:
+    """ Looks up the test cases in batches, as the UI filters do. Returns the
+        ids of the ones that aren't deprecated, in order, and the ids that
+        aren't on codeBeamer.
+    """
+    statuses = {}
+    for i in range(0, len(tc_ids), CB_API_BATCH_SIZE):
+        batch = ", ".join(tc_ids[i:i + CB_API_BATCH_SIZE])
+        for item in cb_query(client, f"item.id IN ({batch})"):
+            statuses[str(item["id"])] = (item.get("status") or {}).get("name", "")
+    active = [
+        int(tc_id) for tc_id in tc_ids
+        if tc_id in statuses and statuses[tc_id].lower() != "deprecated"]
+    return active, [tc_id for tc_id in tc_ids if tc_id not in statuses]
+
+def get_test_set_case_ids(item: dict) -> list[int]:
+    """ Ids of the test cases already in the test set `item`. """
+    ids = []
+    for field in item.get("customFields", []):
+        if field.get("fieldId") != TEST_SET_CASES_FIELD_ID:
+            continue
+        for row in field.get("values", []):
+            for cell in row:
+                if cell.get("fieldId") == TEST_SET_CASE_COLUMN_ID:
+                    ids.extend(ref["id"] for ref in cell.get("values", []))
+    return ids
+
+def create_test_set_rest(
+        client: CodeBeamerClient, plan: RunPlan, tracker_id: str,
+        component_name: str, res_col_name: str) -> str:
+    """ Creates the test set of `create_test_set` through the REST API, or
+        appends to the existing one, in a few batched calls.
+        Returns a link to the test set
+    """
+    if not tracker_id:
+        raise CodeBeamerApiError(
+            "Set the 'test_set_tracker_id' of the project in the CONFIG to "\
+            "use the REST transport.")
+    test_set_name = get_test_set_name(component_name, res_col_name)
+    tc_ids, missing_ids = get_active_test_cases(
+        client, list(dict.fromkeys(r.id for r in plan)))
+    if missing_ids:
+        print(f"⚠ WARNING: {len(missing_ids)} test case(s) weren't found "\
+              "on codeBeamer 😪")
+        for i, tc_id in enumerate(missing_ids, 1):
+            print(f"{i}. {tc_id}")
+
+    item = find_test_set_item(client, tracker_id, test_set_name)
+    if item is None:
+        print("There's no existing test set for this. Creating a new one for you...")
+        item = client.request(
+            "POST", f"/trackers/{tracker_id}/items", {"name": test_set_name})
+    else:
+        print("Found an existing test set! Appending onto the existing set 😎")
+        item = client.request("GET", f"/items/{item['id']}")
+        tc_ids = list(dict.fromkeys(get_test_set_case_ids(item) + tc_ids))
+
+    client.request("PUT", f"/items/{item['id']}/fields", {
+        "fieldValues": [],
+        "tableValues": [{
+            "fieldId": TEST_SET_CASES_FIELD_ID,
+            "type": "TableFieldValue",
+            "values": [[{
+                "fieldId": TEST_SET_CASE_COLUMN_ID,
+                "type": "ChoiceFieldValue",
+                "values": [{"id": tc_id, "type": "TrackerItemReference"}],
+            }] for tc_id in tc_ids],
+        }],
+    })
+    print("Adding complete!")
+    return f"{client.base_url}/cb/issue/{item['id']}"
+
+
+
+def result_update(record: RunRecord) -> dict:
+    """ The REST API's update of the run of `record`'s test case. """
+    update = {
+        "testCaseReference": {"id": int(record.id), "type": "TrackerItemReference"},
+        "result": REST_RESULTS[record.result],
+    }
+    # Like the browser, which only types the comments of the other results.
+    # Empty comments are 'nan' after `setup_df`.
+    if record.result != "pass" and record.comment != 'nan':
+        update["conclusion"] = record.comment
+    if record.result == "fail":
+        update["reportedBugReferences"] = [
+            {"id": int(ticket), "type": "TrackerItemReference"}
+            for ticket in record.tickets]
+    return update
+
+def submit_result_batch(
+        client: CodeBeamerClient, test_run_id: str, records: list[RunRecord]
+        ) -> list[tuple[RunRecord, str]]:
+    """ Submits the results in one request. If it fails, every result is
+        tried again on its own, up to `RESULT_TRIES` times. Returns the
+        records that still failed, with the error.
+    """
+    def put(batch: list[RunRecord]):
+        client.request("PUT", f"/testruns/{test_run_id}", {
+            "updateRequestModels": [result_update(r) for r in batch],
+            "parentResultPropagation": True,
+        })
+
+    try:
+        put(records)
+        return []
+    except (CodeBeamerApiError, urllib3.exceptions.HTTPError) as e:
+        print(f"A batch of {len(records)} results failed. "\
+              "Trying them one by one... 🔁")
+
+    failed = []
+    for record in records:
+        for tries in range(RESULT_TRIES - 1, -1, -1):
+            try:
+                put([record])
+                break
+            except (CodeBeamerApiError, urllib3.exceptions.HTTPError) as e:
+                if tries == 0:
+                    failed.append((record, str(e)))
+                else:
+                    time.sleep(0.2 * (RESULT_TRIES - tries))
+    return failed
+
+def submit_results_rest(
+        client: CodeBeamerClient, test_run_id: str, plan: RunPlan,
+        tc_ids: list[str] | None = None,
+        batch_size=RESULT_BATCH_SIZE, workers=RESULT_WORKERS
+        ) -> list[tuple[RunRecord, str]]:
+    """ Submits the result of every test case of the run plan, or only of
+        `tc_ids`, to the test run. Up to `workers` batches of `batch_size`
+        are in flight at once. Returns the records that couldn't be
+        submitted, with the error.
+    """
+    ids = plan.by_id if tc_ids is None else dict.fromkeys(tc_ids)
+    records = [
+        plan.by_id[tc_id] for tc_id in ids
+        if tc_id in plan.by_id and plan.by_id[tc_id].result in REST_RESULTS]
+    batches = [
+        records[i:i + batch_size] for i in range(0, len(records), batch_size)]
+
+    print(f"Submitting {len(records)} results in {len(batches)} batch(es)... ⌛")
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        failed = [
+            f for batch_failed in executor.map(
+                lambda batch: submit_result_batch(client, test_run_id, batch),
+                batches)
+            for f in batch_failed]
+    elapsed = time.perf_counter() - start
+
+    submitted = len(records) - len(failed)
+    print(f"📤 Submitted {submitted} results in {elapsed:.2f}s "\
+          f"({submitted / elapsed if elapsed else 0:.1f} TCs/s)")
+    if failed:
+        print(f"⚠ WARNING: {len(failed)} result(s) couldn't be submitted 😪")
+        for i, (record, error) in enumerate(failed, 1):
+            print(f"{i}. {record.id}: {error}")
+    return failed
+
+def load_ticket_cache(cache_path: str | None, base_url: str) -> dict:
+    """ Loads the unexpired tickets of the cache, by id. A fresh cache is
+        returned if it's missing, corrupted or for another server.
+    """
+    if not cache_path:
+        return {}
+    try:
+        with open(cache_path, 'r') as cache_file:
+            cache = json.load(cache_file)
+        if cache.get("server") != base_url:
+            return {}
+    except (OSError, ValueError):
+        return {}
+    now = time.time()
+    return {
+        ticket: entry for ticket, entry in cache.get("tickets", {}).items()
+        if now - entry["checked"] < TICKET_CACHE_TTL[entry["exists"]]}
+
+def save_ticket_cache(cache_path: str | None, base_url: str, tickets: dict):
+    if not cache_path:
+        return
+    try:
+        with open(cache_path, 'w') as cache_file:
+            json.dump({"server": base_url, "tickets": tickets}, cache_file)
+    except OSError as e:
+        print(f"Couldn't save the ticket cache: {e}")
+
+def validate_tickets(
+        client: CodeBeamerClient, plan: RunPlan,
+        cache_path: str | None = TICKET_CACHE_FILE) -> None:
+    """ Checks that every ticket of the failed test cases exists on codeBeamer
+        before the run. Each ticket is looked up once, in concurrent batches,
+        and the answers are cached for `TICKET_CACHE_TTL`. Raises an
+        `IncompleteColumnError` listing the test cases citing missing tickets.
+    """
+    citing: dict[str, list[str]] = {}
+    for record in plan:
+        if record.result == "fail":
+            for ticket in record.tickets:
+                citing.setdefault(ticket, []).append(record.id)
+    if not citing:
+        return
+
+    cache = load_ticket_cache(cache_path, client.base_url)
+    unknown = [ticket for ticket in citing if ticket not in cache]
+    if unknown:
+        print(f"Looking up {len(unknown)} ticket(s) on codeBeamer "\
+              f"({len(citing) - len(unknown)} cached)... ⌛")
+        batches = [
+            unknown[i:i + CB_API_BATCH_SIZE]
+            for i in range(0, len(unknown), CB_API_BATCH_SIZE)]
+        with ThreadPoolExecutor(max_workers=TICKET_WORKERS) as executor:
+            found = {
+                str(item["id"])
+                for items in executor.map(
+                    lambda batch: cb_query(
+                        client, f"item.id IN ({', '.join(batch)})"),
+                    batches)
+                for item in items}
+        now = time.time()
+        for ticket in unknown:
+            cache[ticket] = {"exists": ticket in found, "checked": now}
+        save_ticket_cache(cache_path, client.base_url, cache)
+
+    missing = [ticket for ticket in citing if not cache[ticket]["exists"]]
+    if missing:
+        problems = [
+            f"  - {ticket}: cited by {', '.join(citing[ticket])}"
+            for ticket in missing]
+        raise IncompleteColumnError(
+            f"{len(missing)} ticket(s) in the comments don't exist on "\
+            "codeBeamer, or you can't see them 😗 Fix the links of:\n"
+            + "\n".join(problems))
+    print(f"All {len(citing)} ticket(s) exist on codeBeamer 👍")
+
+def restore_session(driver: webdriver.Chrome) -> bool:
+    """ Loads the unexpired cookies saved by `save_session` into the browser.
+        Returns whether there were any.
+    """
+    try:
+        with open(CB_SESSION_FILE, 'r') as session_file:
+            cookies = json.load(session_file)
+    except (OSError, ValueError):
+        return False
+
+    now = time.time()
+    cookies = [c for c in cookies if c.get("expires", now + 1) > now]
+    if cookies:
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+    return bool(cookies)
+
+def save_session(driver: webdriver.Chrome) -> None:
+    """ Saves the browser's cookies for `restore_session` in the next run. """
+    cookies = []
+    for cookie in driver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]:
+        saved = {k: cookie[k] for k in (
+            "name", "value", "domain", "path", "secure", "httpOnly")}
+        # Session cookies have no expiry date
+        if not cookie.get("session"):
+            saved["expires"] = cookie["expires"]
+        cookies.append(saved)
+    try:
+        with open(CB_SESSION_FILE, 'w') as session_file:
+            json.dump(cookies, session_file)
+    except OSError as e:
+        print(f"Couldn't save the codeBeamer session: {e}")
+
+def login_state(driver: webdriver.Chrome) -> str | None:
+    """ "tree" once the test case tree shows, "error" if the login form
+        reports an error, "login" if it shows without one. None otherwise.
+    """
+    if driver.find_elements(By.CSS_SELECTOR, selector("tree", "tree_pane")):
+        return "tree"
+    if driver.find_elements(By.CSS_SELECTOR, selector("login", "user")):
+        errors = driver.find_elements(
+            By.CSS_SELECTOR, selector("login", "login_error"))
+        return "error" if any(e.is_displayed() for e in errors) else "login"
+    return None
 
 def cb_login(driver: webdriver.Chrome, proj_name:str, component_name: str):
     """ Navigates to the specified CodeBeamer link based on `proj_name` 
     performs login. The `component_name` isn't used yet. Probably won't need it.
+    The session of the last run is reused, so the credentials are only
+    entered once it has expired.
     precondition: The environment variables and `CONFIG` must have 
     been loaded already.
     """
     link = CONFIG["settings"][proj_name]["components"][component_name]\
         ["test_case_link"]
+    restore_session(driver)
     try:
         driver.get(link)
+        # Neither the tree nor the login form, e.g. a maintenance page
+        state = WebDriverWait(driver, 10, 0.2).until(login_state)
+        if state == "tree":
+            print("Reusing the last codeBeamer session 🍪")
+            log_page_load(driver, "Test case tree")
+            return
         driver.find_element(By.ID, "user").send_keys(CB_ID)
         driver.find_element(By.ID, "password").send_keys(CB_PASS)
         driver.find_element(
             By.CSS_SELECTOR, value="input[value='Login']").click()
+
+        # Only a session that reached the tree is worth saving
+        try:
+            WebDriverWait(driver, 20, 0.2).until(
+                lambda d: login_state(d) in ("tree", "error"))
+        except selenium_exceptions.TimeoutException:
+            pass
+        state = login_state(driver)
+        if state in ("error", "login"):
+            raise IncorrectLoginCredentials
+        if state != "tree":
+            raise CodeBeamerMaintenance
+        save_session(driver)
+        log_page_load(driver, "Test case tree")
        
     except IncorrectLoginCredentials as e:
         raise Exception(e)
-    except selenium_exceptions.NoSuchElementException as e:
+    except (selenium_exceptions.NoSuchElementException,
+            selenium_exceptions.TimeoutException) as e:
         raise CodeBeamerMaintenance
         
+def stop_browser(executor: ThreadPoolExecutor, browser: Future | None) -> None:
+    """ Cancels the startup if it hasn't begun, waits for the running step
+        otherwise, and quits Chrome if it was launched, so none is orphaned.
+    """
+    executor.shutdown(wait=True, cancel_futures=True)
+    if browser is None or browser.cancelled() or browser.exception():
+        return
+    browser.result().quit()
+
 def verify_if_correct_test_case(
-        wait: WebDriverWait, spreadsheet_row_n:int, test_set_name:str):
-    try:
-        testset_count = wait.until(EC.visibility_of_element_located(
-            (By.CSS_SELECTOR, "#testSetTestCases-tab"))
-            ).text
-        testrun_summary = wait.until(EC.visibility_of_element_located(
-            (By.CSS_SELECTOR, ".breadcrumbs-summary>a.generated-link"))
-            ).text
-    except selenium_exceptions.TimeoutException as e:
-        raise selenium_exceptions.WebDriverException(
-            "I could not determine the number of test cases from this page. "\
-            "\nDid you provide the correct link to the test set? 😗")
-    testset_count = str_to_int(
-        testset_count.strip().split('Test Cases & Sets (')[1].split(')')[0]
-    )
+        wait: WebDriverWait, spreadsheet_row_n:int, test_set_name:str,
+        page: dict | None = None):
+    """ Reads the test set's count and name from `page`, as returned by
+        `fetch_test_set_page`, if given. Otherwise from the browser.
+    """
+    if page:
+        testset_count, testrun_summary = page["count"], page["summary"]
+    else:
+        try:
+            testset_count = wait.until(EC.visibility_of_element_located(
+                (By.CSS_SELECTOR, selector("test_set", "test_set_count")))
+                ).text
+            testrun_summary = wait.until(EC.visibility_of_element_located(
+                (By.CSS_SELECTOR, selector("test_set", "test_set_summary")))
+                ).text
+        except selenium_exceptions.TimeoutException as e:
+            testset_count = ""
+        testset_count = test_set_count(testset_count)
+        if testset_count is None:
+            raise selenium_exceptions.WebDriverException(
+                "I could not determine the number of test cases from this page. "\
+                "\nDid you provide the correct link to the test set? 😗")
     
     if testset_count != spreadsheet_row_n:
         raise IncompleteColumnError(
             f"There are mismatching number of test cases! "\
-            "Spreadsheet count: {spreadsheet_row_n} | Test set count: "\
-            "{testset_count}")
+            f"Spreadsheet count: {spreadsheet_row_n} | Test set count: "\
+            f"{testset_count}")
     if testrun_summary.strip().lower() != test_set_name.lower():
         raise IncompleteColumnError(
             f"This doesn't appear to be the expected test set: "\
-            "'{test_set_name}'. Ensure that you are using a created a test "\
+            f"'{test_set_name}'. Ensure that you are using a created a test "\
             "set with the script beforehand.")
         
 
+def get_test_set_tc_ids(driver: webdriver.Chrome, timeout=10) -> list[str]:
+    """ Returns the codeBeamer ids of the test cases listed on the test set
+        page, in order, once the list has loaded. The list is empty if none
+        could be read within `timeout` seconds. """
+    try:
+        wait_for_dom(driver, {"selector": "#testSetTestCases a[href]"}, timeout)
+    except (selenium_exceptions.TimeoutException,
+            selenium_exceptions.JavascriptException):
+        return []
+    script = """
+        let ids = [];
+        let tab = document.querySelector('#testSetTestCases');
+        if (tab === null) {
+            return ids;
+        }
+        for (let a of tab.querySelectorAll('a[href]')) {
+            let m = a.getAttribute('href').match(/\\/cb\\/(?:item|issue)\\/(\\d+)/);
+            if (m !== null && !ids.includes(m[1])) {
+                ids.push(m[1]);
+            }
+        }
+        return ids;
+    """
+    try:
+        return driver.execute_script(script) or []
+    except selenium_exceptions.JavascriptException:
+        return []
+
+def attach_bugs_in_dialog(
+        driver: webdriver.Chrome, wait: WebDriverWait, cb_codes: list[str],
+        timeout: float | None = None
+        ) -> list[str]:
+    """ Opens the bug dialog once, searches for any of `cb_codes`, checks
+        every row found and adds them together. The dialog is closed without
+        adding when no row is found. The results are waited for `timeout`
+        seconds, or as long as `wait` does. Returns the codes without a row.
+    """
+    click_on((By.CSS_SELECTOR, '#reportBugButton'), driver, 10)
+
+    # Switch to separate iframe
+    switch_to_iframe(driver, 10)
+
+    click_on((By.CSS_SELECTOR, "#findAnExistingBug-tab"), driver,10)
+    # Typed key by key, since the bug search reacts to key presses
+    # ORed explicitly, whatever operator the search uses between terms
+    set_text(driver, wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, '#searchForBug'))), " OR ".join(cb_codes), keystrokes=True)
+
+    # Wait until the search results to show
+    try:
+        result_wait = wait if timeout is None else WebDriverWait(driver, timeout)
+        result_wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, "#result > div")))
+        missing = cb_js(driver, "checkRows", "#result>table", "tr", list(cb_codes))
+    except selenium_exceptions.TimeoutException:
+        missing = list(cb_codes)
+
+    if len(missing) < len(cb_codes):
+        click_on((By.CSS_SELECTOR, '#findAnExistingBug input[value="Add selected Bugs"]'), driver)
+        driver.switch_to.default_content()
+    else:
+        # Nothing is checked, so there's nothing to add
+        driver.switch_to.default_content()
+        click_on((By.CSS_SELECTOR, '.ui-dialog.cbModalDialog .ui-dialog-titlebar-close'), driver, 5)
+    return missing
+
+def attach_bugs(
+        driver: webdriver.Chrome, wait: WebDriverWait, cb_codes: list[str],
+        combined=True
+        ) -> bool:
+    """ Attaches the bugs to the failed step in a single dialog cycle, if
+        `combined`. The bugs the combined search doesn't find get a dialog
+        cycle each. Returns false once a combined search finds nothing, as
+        the bug search may not support it, so the rest of the run searches
+        bug by bug.
+    """
+    missing = list(cb_codes)
+    if combined and len(missing) > 1:
+        missing = attach_bugs_in_dialog(driver, wait, missing, BUG_SEARCH_TIMEOUT)
+        if len(missing) == len(cb_codes):
+            print("Searching several bugs at once found nothing. "\
+                  "Searching them one by one from now on...")
+            combined = False
+    for cb_code in missing:
+        if attach_bugs_in_dialog(driver, wait, [cb_code]):
+            print(f"The bug {cb_code} couldn't be found in the bug dialog 😢")
+    return combined
+
 def do_test_run(
-        driver: webdriver.Chrome, df: DataFrame, res_col_name:str, component_name: str, proj_name:str, test_set_link:str):
-    """ Main driver to perform a test run. DataFrame is assumed to be 
-        filtered and is following the requirements specified in the guideline.
+        driver: webdriver.Chrome, plan: RunPlan, res_col_name:str, component_name: str, proj_name:str, test_set_link:str,
+        transport="ui"):
+    """ Main driver to perform a test run. The run plan is assumed to be built
+        from a dataframe following the requirements specified in the guideline.
+        With the "rest" `transport`, the results are submitted through the
+        REST API once the test run is created, instead of clicked through.
     """
     
     ver_number = res_col_name[:7].upper()
@@ -1399,7 +3169,7 @@ def do_test_run(
     test_run_item = CONFIG["settings"][proj_name]["test_run_item_prefix"] \
                     + ver_number.split('.')[0]
     test_config:str = CONFIG["settings"][proj_name]["test_configuration"]
-    spreadsheet_row_n = df.shape[0]
+    spreadsheet_row_n = len(plan)
 
     wait = WebDriverWait(driver, 20)
 
@@ -1407,13 +3177,26 @@ def do_test_run(
         input("Creating a test run will now begin. "\
               "\nPress 'Enter' to continue. Otherwise, press ctrl + c: ")
 
+    # Read-only lookups run as plain GETs next to the browser
+    http = browser_client(driver) if HYBRID else None
+    lookups = ThreadPoolExecutor(max_workers=1)
+    test_set_page = None
+
+    if http and not test_set_link:
+        test_set_link = find_test_set_link(
+            http,
+            CONFIG["settings"][proj_name]["components"][component_name]["test_set_link"],
+            test_set_name)
+
     if test_set_link:
+        if http:
+            test_set_page = lookups.submit(fetch_test_set_page, http, test_set_link)
         driver.get(test_set_link)
     else:
         driver.get(CONFIG["settings"][proj_name]["components"][component_name]["test_set_link"])
 
         # Try to wait for the loading banner before searching
-        wait_till_loading_fin(wait)
+        wait_till_loading_fin(driver)
 
         search_elem = wait.until(
             EC.element_to_be_clickable(
@@ -1432,15 +3215,13 @@ def do_test_run(
                 (By.CSS_SELECTOR, 
                 'input[title="Full text search for all fields including '\
                 'comments and attachments."]'), driver)
-            search_elem.send_keys(Keys.CONTROL + "a")
-            search_elem.send_keys(Keys.DELETE)
-            search_elem.send_keys(test_set_name)
+            set_text(driver, search_elem, test_set_name)
 
             # Press "GO"
             click_on((By.CSS_SELECTOR, "#actionBarSearchButton"), driver)
 
             # Wait until loading is finished
-            wait_till_loading_fin(wait)
+            wait_till_loading_fin(driver)
 
             # Search table
             res_tup = table_search(
@@ -1463,10 +3244,31 @@ def do_test_run(
             click_on((By.CSS_SELECTOR, f"a[data-id='{res_tup[2]}']"), driver, 20)    
     
     # Check if there are the same number of test cases
-    verify_if_correct_test_case(wait, spreadsheet_row_n, test_set_name)
+    test_set_page = test_set_page and test_set_page.result()
+    lookups.shutdown()
+    verify_if_correct_test_case(
+        wait, spreadsheet_row_n, test_set_name, test_set_page)
+    log_page_load(driver, "Test set")
+    probe_page(driver, "test_set")
+
+    # Report every test case that can't be found on the spreadsheet up front
+    test_set_tc_ids = (test_set_page and test_set_page["tc_ids"]) \
+        or get_test_set_tc_ids(driver)
+    missing_ids = plan.missing(test_set_tc_ids)
+    if not test_set_tc_ids:
+        print("⚠ WARNING: I couldn't read the test cases of this test set, so "\
+              "the ones missing from your spreadsheet can't be reported "\
+              "up front 😪")
+    elif missing_ids:
+        print(f"⚠ WARNING: {len(missing_ids)} test case(s) of this test set "\
+              "are not on your spreadsheet and will be skipped 😪")
+        for i, tc_id in enumerate(missing_ids, 1):
+            print(f"{i}. {tc_id}")
 
     # Press the play icon
-    wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, 'img[title="New Test Run"'))).click()
+    # Clicked through JS, as the icon has no size when images are blocked
+    driver.execute_script("arguments[0].click();", wait.until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, selector("test_set", "new_test_run")))))
     
     # Search and click item
     search_and_click_on(driver, "#ui-id-5", test_run_item , 'a')
@@ -1485,9 +3287,7 @@ def do_test_run(
 
     # Write name
     summary_elem = driver.find_element(By.CSS_SELECTOR,"#summary")
-    summary_elem.send_keys(Keys.CONTROL + "a")
-    summary_elem.send_keys(Keys.DELETE)
-    summary_elem.send_keys(test_run_name)
+    set_text(driver, summary_elem, test_run_name)
     
     # Select releaseID
     recursive_search_exact_set_attr(driver,'#releaseId', ver_number.split('.')[0] )
@@ -1504,23 +3304,56 @@ def do_test_run(
         input(f"The test run will now begin for the test set: {test_set_name}. Press 'Enter' to continue. Otherwise, press ctrl + c.")
         
     # Up to this point, the test sets are ready!
-    try:
+    if transport == "rest":
         wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR,'.actionBar a[title="Run!"]')))
-        click_on((By.CSS_SELECTOR, '.actionBar a[title="Run!"]'), driver)
+        # The saved test run is shown now
+        test_run_id = TEST_RUN_LINK_PATTERN.search(driver.current_url)
+        if test_run_id:
+            failed = submit_results_rest(
+                cb_client(proj_name, component_name), test_run_id[1], plan,
+                test_set_tc_ids or None)
+            if failed:
+                raise ResultsNotSubmitted(
+                    f"{len(failed)} result(s) of the test run couldn't be "\
+                    f"submitted 😪 Enter them by hand: "\
+                    f"{', '.join(record.id for record, _ in failed)}")
+            return
+        print("I couldn't find the id of the test run 😢 "\
+              "Running it through the browser instead...")
 
-        # Switch to the new tab
-        curr_window = driver.current_window_handle
-        
-        wait.until(lambda d: len(d.window_handles) == 2)
+    try:
+        run_elem = wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR,'.actionBar a[title="Run!"]')))
+        run_link = run_elem.get_dom_attribute("href") or ""
+
+        if run_link and not run_link.startswith(("#", "javascript:")):
+            # Opened in a tab set up beforehand, so the tracker and the
+            # resource policy apply to the run page from its first request
+            run_link = urljoin(driver.current_url, run_link)
+            driver.switch_to.new_window("tab")
+            setup_tab(driver)
+            driver.get(run_link)
+            print("switched to the new window.")
+        else:
+            click_on((By.CSS_SELECTOR, '.actionBar a[title="Run!"]'), driver)
 
-        for window in driver.window_handles:
-            if window != curr_window:
-                driver.switch_to.window(window)
-                driver.maximize_window()
-                print("switched to the new window.")
+            # Switch to the new tab
+            curr_window = driver.current_window_handle
+            
+            wait.until(lambda d: len(d.window_handles) == 2)
+
+            for window in driver.window_handles:
+                if window != curr_window:
+                    driver.switch_to.window(window)
+                    driver.maximize_window()
+                    # The page loaded before the tab was set up, so load it again
+                    setup_tab(driver)
+                    driver.refresh()
+                    print("switched to the new window.")
     
         # Store the number of test cases total
-        tc_metadata_elem:WebElement = wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, 'span[title="Number of Tests finished."]')))
+        tc_metadata_elem:WebElement = wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, selector("test_run", "tests_finished"))))
+        log_page_load(driver, "Test run")
+        probe_page(driver, "test_run")
 
         # Extract the counts
         tc_str = tc_metadata_elem.text.strip().split('of')
@@ -1540,7 +3373,7 @@ def do_test_run(
         print("Test run has started. Please do not move your mouse during the process! ✋")
 
     def get_tc_name(driver: webdriver.Chrome):
-        tc_name = driver.find_element(By.CSS_SELECTOR, '#summaryTd a:last-child').get_attribute("title")
+        tc_name = driver.find_element(By.CSS_SELECTOR, selector("test_run", "run_summary")).get_attribute("title")
         begin = tc_name.find("]") + 2
         tc_name = tc_name[begin:].strip().lower()
         return tc_name
@@ -1549,7 +3382,7 @@ def do_test_run(
         """ The href attribute is always expected to have the format of:
             `/cb/item/<cb_id>?<some_queries>`
          """
-        tc_href = driver.find_element(By.CSS_SELECTOR, '#summaryTd a:last-child').get_attribute("href")
+        tc_href = driver.find_element(By.CSS_SELECTOR, selector("test_run", "run_summary")).get_attribute("href")
         return tc_href.split('/cb/item/')[1].split('?')[0]
 
 
@@ -1559,6 +3392,10 @@ def do_test_run(
         except AttributeError as e:
             raise selenium_exceptions.NoSuchWindowException
     current_turn = ''
+    # The dialog's markup is the same for every test case
+    run_dialog_probed = False
+    # Bugs are searched all at once until that finds nothing
+    combined_bug_search = True
     for i in range(no_finished, total_tc):
         # Wait until the buttons are interactable
         try:
@@ -1570,65 +3407,50 @@ def do_test_run(
             tc_id = get_tc_id(driver)
 
             # Filter and get the row by name
-            row_df = df.loc[df["id"] == tc_id]
-            if row_df.size == 0:
+            record = plan.find(tc_id)
+            if record is None:
                 raise NoEntryFound(f"Row with {tc_name} with id {tc_id} is not found on your spreadsheet 😪")
-            row_df = row_df.iloc[0]
-            result = row_df[res_col_name]
-            comment = row_df["comments"]
+            result = record.result
+            comment = record.comment
+            cb_codes = record.tickets
             
             # The test case passes
             if result == 'pass':
-                while True:
+                for tries in range(2, -1, -1):
                     try:
-                        click_on((By.CSS_SELECTOR, '#buttonTable tr > td button:first-of-type'), driver, 10)
+                        click_on((By.CSS_SELECTOR, selector("test_run", "pass_button")), driver, 10)
                         
-                        driver.find_element(By.CSS_SELECTOR, '#conclusionInDialog')
+                        wait_for_dom(driver, {"selector": selector("run_dialog", "conclusion")}, 5)
                         break
-                    except selenium_exceptions.NoSuchElementException as e:
-                        time.sleep(0.5)
-                        continue
+                    except selenium_exceptions.TimeoutException as e:
+                        if tries == 0:
+                            raise
 
             elif result == 'fail':
                 # Report all bugs first
-                cb_link: list[str] = url_extractor(comment)
-                if len(cb_link) == 0:
+                if len(cb_codes) == 0:
                     print(f"You need to include a cb ticket link for this test case: {tc_name}")
 
-                for link in cb_link:
-                    click_on((By.CSS_SELECTOR, '#reportBugButton'), driver, 10)
-
-                    # Switch to separate iframe
-                    switch_to_iframe(driver, 10)
-
-                    click_on((By.CSS_SELECTOR, "#findAnExistingBug-tab"), driver,10)
-                    start = link.rfind('/')+1
-                    cb_code = link[start:start+8] # 8 digit code
-                    wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, '#searchForBug'))).send_keys(cb_code)
-
-                    # Wait until the search results to show
-                    wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, "#result > div")))
-
-                    table_search_set_attr(driver, "#result>table", "tr",cb_code, attr_key="checked", attr_val="true")
-
-                    click_on((By.CSS_SELECTOR, '#findAnExistingBug input[value="Add selected Bugs"]'), driver)
-
-                    driver.switch_to.default_content()
+                combined_bug_search = attach_bugs(
+                    driver, wait, cb_codes, combined_bug_search)
 
                 # Then proceed to submit failed test case
-                click_on((By.CSS_SELECTOR, 'button[name="failStep"]'), driver, 10)
+                click_on((By.CSS_SELECTOR, selector("test_run", "fail_button")), driver, 10)
 
                 # Write the comment
-                wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, '#conclusionInDialog'))).send_keys(comment)
+                set_text(driver, wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, selector("run_dialog", "conclusion")))), comment)
 
                 pass
             elif result == 'blocked' or result == 'na':
-                click_on((By.CSS_SELECTOR, 'button[name="blockStep"]'), driver, 10)
+                click_on((By.CSS_SELECTOR, selector("test_run", "block_button")), driver, 10)
                 
-                wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, '#conclusionInDialog'))).send_keys(comment)
+                set_text(driver, wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, selector("run_dialog", "conclusion")))), comment)
 
             # Input the summary 
-            search_and_click_on(driver, 'body > div.ui-dialog.ui-corner-all.ui-widget.ui-widget-content.ui-front.cbModalDialog.ui-dialog-buttons.ui-resizable > div.ui-dialog-buttonpane.ui-widget-content.ui-helper-clearfix > div', 'save')
+            if not run_dialog_probed:
+                probe_page(driver, "run_dialog")
+                run_dialog_probed = True
+            search_and_click_on(driver, selector("run_dialog", "dialog_buttons"), 'save')
             
         except selenium_exceptions.TimeoutException as e:
             print(f"Something went wrong. TC: '{tc_name}', {e}")
@@ -1673,9 +3495,14 @@ def print_credits(name, email):
 
 # Main script
 if __name__ == "__main__":
+    # Chrome starts up and logs in here while the spreadsheet is read. A
+    # single worker, so the login always runs after the launch.
+    browser_executor = ThreadPoolExecutor(max_workers=1)
+    browser = None
+    exit_code = 0
+    # Only validate the spreadsheets, without opening the browser
+    validate_only = "--validate-all" in sys.argv
     try:
-        # Start scraping!
-        driver = configure_webdriver()
         global CONFIG
         load_env()
         CONFIG = load_config()
@@ -1683,26 +3510,60 @@ if __name__ == "__main__":
         test_set_link = ''
 
         print_credits("SeungJoon Yang", "tmdwns.yang@gmail.com")
+
+        # The exit status tells scripts whether every spreadsheet is valid
+        if validate_only:
+            sys.exit(0 if validate_all(CONFIG) else 1)
+
+        # Start scraping! Chrome is launched in the background
+        browser = browser_executor.submit(configure_webdriver)
         
         # Get user input to select which project
         proj_name, component_name, create_test_set_ans = get_user_selection(CONFIG)
 
-        # Read get the spreadsheet 
-        df = get_excel(proj_name, component_name)
+        # Perform login in the background, after Chrome is launched
+        login = browser_executor.submit(
+            lambda: cb_login(browser.result(), proj_name, component_name))
 
-        # Perform clean up
+        # Read get the spreadsheet, then perform clean up
         # Verify if the results column and the name columns are valid
-        df, res_col_name = setup_df(df, proj_name, component_name)
+        df, res_col_name = load_spreadsheet(proj_name, component_name)
+        plan = build_run_plan(df, res_col_name)
+        del df
         
-        # Perform login
-        cb_login(driver, proj_name, component_name)
+        transport = project_setting(proj_name, "transport")
+        if transport not in TRANSPORTS:
+            raise Exception(
+                f"Unknown transport '{transport}' for {proj_name.upper()}. "\
+                f"Use one of: {', '.join(TRANSPORTS)}")
+
+        # Reject links to missing tickets before running anything, rather
+        # than in the bug dialog of the test run
+        if CHECK_TICKETS:
+            try:
+                validate_tickets(cb_client(
+                    proj_name, component_name,
+                    timeout=TICKET_CHECK_TIMEOUT, retries=0), plan)
+            except (CodeBeamerApiError, urllib3.exceptions.HTTPError) as e:
+                print(f"Couldn't check the tickets ahead, skipping it: {e}")
+
+        # The REST transport creates the test set while Chrome starts
+        if create_test_set_ans and transport == "rest":
+            test_set_link = create_test_set_rest(
+                cb_client(proj_name, component_name), plan,
+                project_setting(proj_name, "test_set_tracker_id"),
+                component_name, res_col_name)
+
+        # Wait for the login to finish
+        login.result()
+        driver = browser.result()
         
         # Start creating/adding test cases
-        if create_test_set_ans:
-            test_set_link = create_test_set(driver, df, component_name, res_col_name)
+        if create_test_set_ans and transport == "ui":
+            test_set_link = create_test_set(driver, plan, component_name, res_col_name)
         
         # Perform test run
-        do_test_run(driver, df, res_col_name, component_name, proj_name, test_set_link)
+        do_test_run(driver, plan, res_col_name, component_name, proj_name, test_set_link, transport)
 
         print("Successful run! 👏 Nice work!")
 
@@ -1721,11 +3582,21 @@ if __name__ == "__main__":
         # print(msg)
     except CodeBeamerMaintenance as e:
         print(e)
+    except SelectorProbeFailed as e:
+        print(e)
+    except CodeBeamerApiError as e:
+        print(e)
+    except ResultsNotSubmitted as e:
+        print(e)
+        exit_code = 1
     except Exception as e:
         print(e)
     finally:
-        input("Press 'Enter' key to exit...")
+        # Nothing to read on the screen in scripts validating the spreadsheets
+        if not validate_only:
+            input("Press 'Enter' key to exit...")
         print("Exiting...")
         print("Cleaning up 🧹... Please wait")
-        driver.quit()
+        stop_browser(browser_executor, browser)
+    sys.exit(exit_code)
     
\ No newline at end of file
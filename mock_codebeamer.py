@@ -0,0 +1,230 @@
+""" In-memory stand-in for the part of codeBeamer's REST API used by the REST
+    transport of `create_testset.py`, to test and benchmark it offline.
+    Run it to benchmark creating and then appending to a test set, checking
+    the tickets and submitting the results of its test run:
+
+        python mock_codebeamer.py [number of test cases] [latency in ms] [failure rate]
+"""
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+API_PATH = "/cb/api/v3"
+ITEM_ID_QUERY = re.compile(r"^item\.id IN \(([\d,\s]*)\)$")
+TEST_SET_QUERY = re.compile(
+    r"^tracker\.id IN \((\d+)\) AND summary = '((?:[^'\\]|\\.)*)'$")
+
+
+class MockCodeBeamer(ThreadingHTTPServer):
+    """ Serves the items it holds in memory. `latency` is added to every
+        response to stand in for the round trip to the real server. A
+        `failure_rate` share of the test run updates fail, to exercise the
+        retries.
+    """
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), latency=0.0, failure_rate=0.0):
+        super().__init__(address, MockHandler)
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.random = random.Random(0)
+        self.items: dict[int, dict] = {}
+        # Results by test run, then test case id
+        self.test_runs: dict[int, dict[int, dict]] = {}
+        self.next_id = 90000000
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockCodeBeamer":
+        """ Serves on a background thread until `shutdown`. """
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def add_test_case(self, id: int, name: str, status="Accepted") -> None:
+        self.items[id] = {
+            "id": id, "name": name, "status": {"name": status},
+            "tracker": {"id": 0}, "customFields": []}
+
+    def new_item(self, tracker_id: int, name: str) -> dict:
+        with self.lock:
+            self.next_id += 1
+            item = {
+                "id": self.next_id, "name": name, "status": {"name": "New"},
+                "tracker": {"id": tracker_id}, "customFields": []}
+            self.items[item["id"]] = item
+        return item
+
+    def query(self, query: str) -> list[dict]:
+        """ Supports the cbQL queries the REST transport sends. """
+        match = ITEM_ID_QUERY.match(query)
+        if match:
+            ids = [int(i) for i in match.group(1).split(",") if i.strip()]
+            return [self.items[i] for i in ids if i in self.items]
+        match = TEST_SET_QUERY.match(query)
+        if match:
+            tracker_id = int(match.group(1))
+            name = re.sub(r"\\(.)", r"\1", match.group(2))
+            return [
+                item for item in self.items.values()
+                if item["tracker"]["id"] == tracker_id and item["name"] == name]
+        raise ValueError(f"Unsupported query: {query}")
+
+    def update_test_run(self, test_run_id: int, updates: list[dict]) -> bool:
+        """ Records the results, or none of them if the update fails. """
+        with self.lock:
+            if self.random.random() < self.failure_rate:
+                return False
+            for update in updates:
+                tc_id = update["testCaseReference"]["id"]
+                if tc_id not in self.items:
+                    raise KeyError(tc_id)
+            results = self.test_runs.setdefault(test_run_id, {})
+            for update in updates:
+                results[update["testCaseReference"]["id"]] = update
+        return True
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    # Keeps the connections alive, like codeBeamer does
+    protocol_version = "HTTP/1.1"
+    server: MockCodeBeamer
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.route("GET")
+
+    def do_POST(self):
+        self.route("POST")
+
+    def do_PUT(self):
+        self.route("PUT")
+
+    def send_json(self, status: int, body) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length)) if length else None
+
+    def route(self, method: str) -> None:
+        body = self.read_json()
+        with self.server.lock:
+            self.server.requests += 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if not self.headers.get("Authorization", "").startswith("Basic "):
+            self.send_json(401, {"message": "Unauthorized"})
+            return
+
+        url = urlsplit(self.path)
+        parts = url.path.removeprefix(API_PATH).strip("/").split("/")
+        items = self.server.items
+        try:
+            if method == "GET" and parts == ["items", "query"]:
+                params = parse_qs(url.query)
+                page = int(params.get("page", ["1"])[0])
+                page_size = int(params.get("pageSize", ["25"])[0])
+                found = self.server.query(params["queryString"][0])
+                self.send_json(200, {
+                    "page": page, "pageSize": page_size, "total": len(found),
+                    "items": found[(page - 1) * page_size:page * page_size]})
+            elif method == "GET" and len(parts) == 2 and parts[0] == "items":
+                self.send_json(200, items[int(parts[1])])
+            elif method == "POST" and len(parts) == 3 and parts[0] == "trackers":
+                self.send_json(
+                    201, self.server.new_item(int(parts[1]), body["name"]))
+            elif method == "PUT" and len(parts) == 2 and parts[0] == "testruns":
+                if self.server.update_test_run(
+                        int(parts[1]), body["updateRequestModels"]):
+                    self.send_json(200, {"id": int(parts[1])})
+                else:
+                    self.send_json(500, {"message": "Injected failure"})
+            elif method == "PUT" and len(parts) == 3 and parts[2] == "fields":
+                item = items[int(parts[1])]
+                fields = {f["fieldId"]: f for f in item["customFields"]}
+                for field in body.get("fieldValues", []) + body.get("tableValues", []):
+                    fields[field["fieldId"]] = field
+                item["customFields"] = list(fields.values())
+                self.send_json(200, item)
+            else:
+                self.send_json(404, {"message": f"No route for {method} {url.path}"})
+        except KeyError as e:
+            self.send_json(404, {"message": f"Not found: {e}"})
+        except (ValueError, TypeError) as e:
+            self.send_json(400, {"message": str(e)})
+
+
+def benchmark(tc_count=2000, latency=0.02, failure_rate=0.0):
+    """ Creates a test set of `tc_count` test cases, appends to it, checks
+        the tickets, then submits the results of its test run.
+    """
+    import create_testset as cts
+
+    server = MockCodeBeamer(latency=latency, failure_rate=failure_rate).start()
+    server.add_test_case(12345678, "A bug")
+    records = []
+    for i in range(tc_count):
+        tc_id = 10000000 + i
+        # Some are deprecated, like on the real trackers
+        server.add_test_case(
+            tc_id, f"TC {i}", "Deprecated" if i % 20 == 0 else "Accepted")
+        result = ("pass", "pass", "pass", "fail", "blocked")[i % 5]
+        # Most passes have no comment, which `setup_df` leaves as 'nan'
+        comment = 'nan' if result == "pass" and i % 2 else f"Comment {i}"
+        records.append(cts.RunRecord(
+            str(tc_id), f"TC {i}", result, comment,
+            ("12345678",) if result == "fail" else ()))
+    plan = cts.RunPlan(records, "N123.45 P0")
+    client = cts.CodeBeamerClient(server.base_url, "user", "password")
+
+    try:
+        for step in ("Create", "Append"):
+            before = server.requests
+            start = time.perf_counter()
+            link = cts.create_test_set_rest(client, plan, "4242", "nav", "N123.45 P0")
+            elapsed = time.perf_counter() - start
+            print(f"⏱ {step}: {tc_count} test cases in {elapsed:.2f}s with "\
+                  f"{server.requests - before} requests ({link})")
+
+        before = server.requests
+        start = time.perf_counter()
+        cts.validate_tickets(client, plan, cache_path=None)
+        print(f"⏱ Tickets: checked in {time.perf_counter() - start:.2f}s "\
+              f"with {server.requests - before} requests")
+
+        test_run_id = server.new_item(4243, "Test run")["id"]
+        before = server.requests
+        failed = cts.submit_results_rest(client, str(test_run_id), plan)
+        stored = server.test_runs.get(test_run_id, {})
+        # Empty comments must not be written as the conclusion
+        nan_conclusions = sum(
+            1 for update in stored.values() if update.get("conclusion") == 'nan')
+        print(f"⏱ Submit: {len(stored)} results stored, {len(failed)} "\
+              f"failed, {nan_conclusions} 'nan' conclusions, "\
+              f"{server.requests - before} requests")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    benchmark(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 2000,
+        float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.02,
+        float(sys.argv[3]) if len(sys.argv) > 3 else 0.0)